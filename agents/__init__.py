@@ -1,4 +1,26 @@
-from .core.llm_factory import get_llm, load_llm_config
-from .core.requirement_excavation_skill import RequirementExcavationSkill
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .core.llm_factory import get_llm, load_llm_config
+    from .core.requirement_excavation_skill import RequirementExcavationSkill
 
 __all__ = ["RequirementExcavationSkill", "get_llm", "load_llm_config"]
+
+_LAZY_EXPORTS = {
+    "RequirementExcavationSkill": ".core.requirement_excavation_skill",
+    "get_llm": ".core.llm_factory",
+    "load_llm_config": ".core.llm_factory",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
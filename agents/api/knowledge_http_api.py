@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-from dataclasses import asdict
 import hmac
 import json
 import os
@@ -185,7 +184,7 @@ class KnowledgeHttpApi:
                         qs = parse_qs(parsed.query or "")
                         kp = (qs.get("knowledge_path") or [None])[0]
                         snap = api.service.read(kp)
-                        _write_json(self, 200, {"ok": True, "result": asdict(snap)})
+                        _write_json(self, 200, {"ok": True, "result": snap.to_json_dict()})
                         return
                     raise _JsonError("not_found", status=404)
                 except _JsonError as e:
@@ -1,21 +1,38 @@
 from __future__ import annotations
 
+import functools
 import importlib
+import importlib.util
 import os
 from pathlib import Path
+import re
+import shutil
 import subprocess
 import sys
 import time
 from typing import Any
 
 
+_YES_TOKENS: frozenset[str] = frozenset({"y", "yes", "是", "1", "true"})
+_ENV_KEY_RE = re.compile(rb"[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=")
+
+
+@functools.lru_cache(maxsize=1)
 def _repo_root() -> Path:
-    return Path(__file__).resolve().parent.parent.parent
+    return Path(os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__)))))
 
 
 def _ask(prompt: str) -> str:
     sys.stdout.write(prompt)
     sys.stdout.flush()
+    stdin = sys.stdin
+    if stdin is None:
+        return ""
+    if not stdin.isatty():
+        try:
+            return stdin.readline().strip()
+        except Exception:
+            return ""
     try:
         return (input() or "").strip()
     except EOFError:
@@ -25,18 +42,16 @@ def _ask(prompt: str) -> str:
 def _ask_yes_no(prompt: str, *, default: bool = False) -> bool:
     suffix = " (Y/n) " if default else " (y/N) "
     raw = _ask(prompt.rstrip() + suffix).strip().lower()
-    if not raw:
-        return default
-    return raw in {"y", "yes", "是", "1", "true"}
+    return raw in _YES_TOKENS if raw else default
 
 
 def _ask_choice(prompt: str, choices: list[str], *, default_index: int = 0) -> str:
     if not choices:
         return ""
-    for i, c in enumerate(choices, 1):
-        tag = " (默认)" if i - 1 == default_index else ""
-        sys.stdout.write(f"{i}) {c}{tag}\n")
-    raw = _ask(prompt).strip()
+    sys.stdout.write(
+        "".join(f"{i}) {c}{' (默认)' if i - 1 == default_index else ''}\n" for i, c in enumerate(choices, 1)) + prompt
+    )
+    raw = _ask("").strip()
     if not raw:
         return choices[default_index]
     if raw.isdigit():
@@ -55,39 +70,44 @@ def _ask_secret(prompt: str) -> str:
         return _ask(prompt).strip()
 
 
-def _write_env_kv(env_path: Path, key: str, value: str) -> None:
-    env_path.parent.mkdir(parents=True, exist_ok=True)
-    if env_path.exists():
-        lines = env_path.read_text(encoding="utf-8").splitlines()
-    else:
-        lines = []
-    out: list[str] = []
-    replaced = False
-    for line in lines:
-        s = line.strip()
-        if not s or s.startswith("#") or "=" not in s:
-            out.append(line)
-            continue
-        k, _v = s.split("=", 1)
-        if k.strip() == key:
-            out.append(f"{key}={value}")
-            replaced = True
+def _write_env_kv(env_path: Path, updates: dict[str, str]) -> bool:
+    if not updates:
+        return False
+    try:
+        original: bytes | None = env_path.read_bytes()
+    except FileNotFoundError:
+        original = None
+    buf = bytearray()
+    seen: set[str] = set()
+    for line in (original or b"").splitlines(keepends=True):
+        m = _ENV_KEY_RE.match(line)
+        key = m.group(1).decode("ascii") if m else ""
+        if key in updates:
+            eol = b"\r\n" if line.endswith(b"\r\n") else b"\n"
+            buf += f"{key}={updates[key]}".encode("utf-8") + eol
+            seen.add(key)
         else:
-            out.append(line)
-    if not replaced:
-        if out and out[-1].strip():
-            out.append("")
-        out.append(f"{key}={value}")
-    env_path.write_text("\n".join(out).rstrip() + "\n", encoding="utf-8")
+            buf += line
+    data = bytes(buf).rstrip()
+    missing = [k for k in updates if k not in seen]
+    if missing:
+        tail = "\n".join(f"{k}={updates[k]}" for k in missing).encode("utf-8")
+        data = data + b"\n\n" + tail if data else tail
+    data += b"\n"
+    if data == original:
+        return False
+    env_path.parent.mkdir(parents=True, exist_ok=True)
+    env_path.write_bytes(data)
+    return True
 
 
 def _dump_yaml(path: Path, data: dict[str, Any]) -> None:
     try:
-        import yaml
+        from ..core import yaml_io
     except Exception as e:
         raise RuntimeError(f"缺少依赖 PyYAML，无法写入配置：{e}") from e
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(yaml.safe_dump(data, sort_keys=False, allow_unicode=True), encoding="utf-8")
+    path.write_text(yaml_io.safe_dump(data), encoding="utf-8")
 
 
 def init_config_main(*, config_out: str | None) -> int:
@@ -107,26 +127,44 @@ def init_config_main(*, config_out: str | None) -> int:
         if not overwrite:
             sys.stdout.write("未覆盖。\n")
             return 0
-    dst.write_text(src.read_text(encoding="utf-8"), encoding="utf-8")
+    shutil.copyfile(src, dst)
     sys.stdout.write(f"已生成：{dst}\n")
     sys.stdout.write(f"下一步：编辑 {dst.name}，并在 .env 中配置对应的 API Key（不要把 Key 写进 yaml）。\n")
     return 0
 
 
-def check_deps_main() -> int:
+def _has_module(mod: str, *, deep: bool = False) -> bool:
+    try:
+        if deep:
+            importlib.import_module(mod)
+            return True
+        return mod in sys.modules or importlib.util.find_spec(mod) is not None
+    except Exception:
+        return False
+
+
+def check_deps_main(*, deep: bool = False) -> int:
     targets = [
         ("PyYAML", "yaml"),
         ("crewai", "crewai"),
         ("langchain-openai", "langchain_openai"),
     ]
+    optional = [
+        ("libyaml（PyYAML C 加速）", "yaml._yaml"),
+        ("orjson", "orjson"),
+    ]
     ok = True
     for label, mod in targets:
-        try:
-            importlib.import_module(mod)
+        if _has_module(mod, deep=deep):
             sys.stdout.write(f"已安装：{label}\n")
-        except Exception:
+        else:
             ok = False
             sys.stdout.write(f"缺少：{label}\n")
+    for label, mod in optional:
+        if _has_module(mod):
+            sys.stdout.write(f"已启用（可选）：{label}\n")
+        else:
+            sys.stdout.write(f"未启用（可选）：{label}\n")
     if ok:
         sys.stdout.write("依赖检查通过。\n")
         return 0
@@ -162,6 +200,12 @@ def install_main(*, no_deps: bool = True) -> int:
             sys.stdout.write("已启动安装进程（稍后开始执行）；请等待其完成后再运行 reqx。\n")
             return 0
 
+    if os.name == "posix":
+        sys.stdout.write("正在以可编辑模式安装本仓库（pip 接管当前进程）。\n")
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.execv(python, cmd)
+
     subprocess.check_call(cmd)
     sys.stdout.write("完成：已以可编辑模式安装本仓库。\n")
     return 0
@@ -169,7 +213,7 @@ def install_main(*, no_deps: bool = True) -> int:
 
 def check_api_main(*, config_path: str | None) -> int:
     try:
-        import yaml
+        from ..core import yaml_io
         from ..core.llm_factory import get_llm, load_llm_config, redact_secrets
     except Exception as e:
         sys.stdout.write(f"缺少依赖，无法进行健康检查：{e}\n")
@@ -191,18 +235,18 @@ def check_api_main(*, config_path: str | None) -> int:
         sys.stdout.write(f"配置解析失败：{redact_secrets(str(e))}\n")
         return 1
     try:
-        llm = get_llm(config_path=str(resolved), strict=True, max_tokens=16, temperature=0)
+        llm = get_llm(cfg=cfg, max_tokens=16, temperature=0)
     except Exception as e:
         sys.stdout.write(f"模型初始化失败：{redact_secrets(str(e))}\n")
         return 1
-    started = time.time()
+    started_ns = time.perf_counter_ns()
     try:
         out = (llm.invoke("Return exactly: OK").content or "").strip()
     except Exception as e:
         payload = {"ok": False, "error": {"code": "invoke_failed", "message": redact_secrets(str(e))}}
-        sys.stdout.write(yaml.safe_dump(payload, sort_keys=False, allow_unicode=True))
+        sys.stdout.write(yaml_io.safe_dump(payload))
         return 1
-    elapsed_ms = int((time.time() - started) * 1000)
+    elapsed_ms = (time.perf_counter_ns() - started_ns) // 1_000_000
     payload = {
         "ok": bool(out),
         "provider": cfg.provider,
@@ -210,7 +254,7 @@ def check_api_main(*, config_path: str | None) -> int:
         "latency_ms": elapsed_ms,
         "response_preview": (out[:80] if isinstance(out, str) else ""),
     }
-    sys.stdout.write(yaml.safe_dump(payload, sort_keys=False, allow_unicode=True))
+    sys.stdout.write(yaml_io.safe_dump(payload))
     return 0 if payload["ok"] else 1
 
 
@@ -285,7 +329,7 @@ def wizard_main() -> int:
     if key_env and _ask_yes_no(f"是否现在把 {key_env} 写入 env 文件？（推荐）", default=True):
         key_value = _ask_secret(f"请输入 {key_env}（输入时不回显；回车跳过）：")
         if key_value:
-            _write_env_kv(env_path, key_env, key_value)
+            _write_env_kv(env_path, {key_env: key_value})
             sys.stdout.write(f"已写入：{env_path}\n\n")
         else:
             sys.stdout.write("未写入 env。\n\n")
@@ -3,8 +3,6 @@ from __future__ import annotations
 from pathlib import Path
 import sys
 
-import yaml
-
 from .common import (
     build_chat_prompt,
     is_interactive,
@@ -19,6 +17,7 @@ from .common import (
     tool_run,
 )
 from ..storage.knowledge_store import open_knowledge_store
+from ..core import yaml_io
 from ..core.llm_factory import get_llm, load_llm_config, redact_secrets
 from ..core.requirement_excavation_skill import RequirementExcavationSkill
 from ..storage.transcript_store import open_transcript_store
@@ -86,7 +85,7 @@ def chat_main(
 
     log("正在加载配置并初始化 LLM...")
     cfg = load_llm_config(config_path, strict=True)
-    llm = get_llm(config_path=config_path, strict=True)
+    llm = get_llm(cfg=cfg)
     tool = RequirementExcavationSkill(llm=llm, config_path=config_path)
 
     if resume_transcript:
@@ -177,7 +176,7 @@ def chat_main(
         try:
             log(f"正在调用模型（{cfg.provider}/{cfg.model}；可 Ctrl+C 中断）...")
             content = getattr(llm.invoke(prompt), "content", "") or ""
-            raw_reply = content if isinstance(content, str) else yaml.safe_dump(content, sort_keys=False, allow_unicode=True)
+            raw_reply = content if isinstance(content, str) else yaml_io.safe_dump(content)
             raw_reply = raw_reply.strip()
         except KeyboardInterrupt:
             messages.pop()
@@ -199,14 +198,11 @@ def chat_main(
                     },
                 }
             }
-            sys.stdout.write(yaml.safe_dump(payload, sort_keys=False, allow_unicode=True) + "\n")
+            sys.stdout.write(yaml_io.safe_dump(payload) + "\n")
             continue
 
         visible_reply, knowledge_items = parse_knowledge_update(raw_reply)
-        appended = 0
-        for item in knowledge_items:
-            knowledge_store.append("system", item, autosave=False)
-            appended += 1
+        appended = knowledge_store.extend("system", knowledge_items, autosave=False)
         if appended and (not dry_run):
             knowledge_store.save()
 
@@ -54,9 +54,10 @@ def truncate_text(text: str, limit: int, *, keep: str = "tail") -> str:
 
 
 def load_global_prompt() -> str:
-    if _GLOBAL_PROMPT_PATH.exists():
+    try:
         return _GLOBAL_PROMPT_PATH.read_text(encoding="utf-8").strip()
-    return _DEFAULT_GLOBAL_PROMPT.strip()
+    except FileNotFoundError:
+        return _DEFAULT_GLOBAL_PROMPT.strip()
 
 
 def format_transcript(messages: list[tuple[str, str]]) -> str:
@@ -4,8 +4,7 @@ import os
 from pathlib import Path
 import sys
 
-import yaml
-
+from ..core import yaml_io
 from ..core.llm_factory import load_llm_config
 
 
@@ -47,6 +46,6 @@ def doctor_main(*, config_path: str | None) -> int:
         "warnings": list(cfg.warnings),
     }
 
-    sys.stdout.write(yaml.safe_dump(payload, sort_keys=False, allow_unicode=True))
+    sys.stdout.write(yaml_io.safe_dump(payload))
     return 0
 
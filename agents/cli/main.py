@@ -2,14 +2,13 @@ from __future__ import annotations
 
 import argparse
 import os
-from pathlib import Path
 import sys
 import threading
 import webbrowser
-
-import yaml
+from typing import Any, Callable
 
 from .admin import (
+    _repo_root,
     check_api_main,
     check_deps_main,
     clean_main,
@@ -17,13 +16,25 @@ from .admin import (
     install_main,
     wizard_main,
 )
-from .chat import chat_main
-from .doctor import doctor_main
-from .spec import spec_main
+from ..core import yaml_io
+
+
+def chat_main(**kwargs: Any) -> int:
+    from .chat import chat_main as _chat_main
+
+    return _chat_main(**kwargs)
+
+
+def doctor_main(**kwargs: Any) -> int:
+    from .doctor import doctor_main as _doctor_main
 
+    return _doctor_main(**kwargs)
 
-def _repo_root() -> Path:
-    return Path(__file__).resolve().parent.parent.parent
+
+def spec_main(**kwargs: Any) -> int:
+    from .spec import spec_main as _spec_main
+
+    return _spec_main(**kwargs)
 
 
 def _write_missing_config_yaml() -> None:
@@ -34,7 +45,7 @@ def _write_missing_config_yaml() -> None:
             "details": {"hint": "请使用 --config 指定配置文件，或设置环境变量 LLM_CONFIG_PATH"},
         }
     }
-    sys.stdout.write(yaml.safe_dump(payload, sort_keys=False, allow_unicode=True))
+    sys.stdout.write(yaml_io.safe_dump(payload))
 
 
 def _require_config(config_path: str | None) -> str | None:
@@ -44,6 +55,11 @@ def _require_config(config_path: str | None) -> str | None:
     return config_path
 
 
+def _web_url(bind: str, port: int) -> str:
+    host = f"[{bind}]" if ":" in bind else bind
+    return f"http://{host}:{int(port)}/"
+
+
 def _build_legacy_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Requirement excavation CLI")
     p.add_argument("--config", default=None, help="配置文件路径（不提供则使用环境变量 LLM_CONFIG_PATH）")
@@ -111,6 +127,9 @@ def _build_parser() -> argparse.ArgumentParser:
     p_web.add_argument("--bind", default="127.0.0.1", help="WebUI 监听地址（默认 127.0.0.1）")
     p_web.add_argument("--port", type=int, default=8788, help="WebUI 监听端口（默认 8788）")
     p_web.add_argument("--dry-run", action="store_true", help="只演练不落盘（WebUI 禁止写入）")
+    p_web.add_argument("--max-inflight-requests", type=int, default=None, help="同时处理的 POST 请求数上限（默认按 CPU 数推算）")
+    p_web.add_argument("--llm-concurrency", type=int, default=None, help="同时进行的 LLM 调用上限（默认 4）")
+    p_web.add_argument("--llm-timeout", type=float, default=None, help="单次 LLM 调用超时秒数（超时返回 504；默认不限）")
     p_web.add_argument("--open-browser", action="store_true", help="启动后自动打开浏览器（默认：交互终端下开启）")
     p_web.add_argument("--no-open-browser", action="store_true", help="不自动打开浏览器（覆盖默认行为）")
 
@@ -129,7 +148,8 @@ def _build_parser() -> argparse.ArgumentParser:
     p_check = sub.add_parser("check-api", help="验证 API 配置是否可用（健康检查）")
     p_check.add_argument("--config", default=None, help="配置文件路径（默认交互式询问）")
 
-    sub.add_parser("check-deps", help="检查依赖是否已安装")
+    p_deps = sub.add_parser("check-deps", help="检查依赖是否已安装")
+    p_deps.add_argument("--deep", action="store_true", help="逐个真正导入依赖（较慢；用于排查安装损坏）")
     sub.add_parser("clean", help="清理项目缓存与构建产物")
 
     p_install = sub.add_parser("install", help="以可编辑模式安装本仓库")
@@ -176,7 +196,7 @@ def main(argv: list[str] | None = None) -> int:
                 return 1
             from ..web.server import serve_webui
 
-            url = f"http://{args.web_bind}:{int(args.web_port)}/"
+            url = _web_url(str(args.web_bind), args.web_port)
             sys.stderr.write(f"WebUI listening on {url} (使用完成后需按ctrl+c打断)\n")
             if _is_interactive_terminal():
                 _open_browser_later(url)
@@ -274,7 +294,7 @@ def main(argv: list[str] | None = None) -> int:
             return 1
         from ..web.server import serve_webui
 
-        url = f"http://{args.bind}:{int(args.port)}/"
+        url = _web_url(str(args.bind), args.port)
         sys.stderr.write(f"WebUI listening on {url} (Ctrl+C to stop)\n")
         open_browser = None
         if bool(getattr(args, "open_browser", False)):
@@ -285,7 +305,14 @@ def main(argv: list[str] | None = None) -> int:
             open_browser = _is_interactive_terminal()
         if open_browser:
             _open_browser_later(url)
-        serve_webui(repo_root=_repo_root(), bind=str(args.bind), port=int(args.port), dry_run=bool(args.dry_run))
+        tuning: dict[str, Any] = {}
+        if args.max_inflight_requests:
+            tuning["max_inflight_requests"] = max(1, int(args.max_inflight_requests))
+        if args.llm_concurrency:
+            tuning["llm_concurrency"] = max(1, int(args.llm_concurrency))
+        if args.llm_timeout:
+            tuning["llm_timeout_s"] = float(args.llm_timeout)
+        serve_webui(repo_root=_repo_root(), bind=str(args.bind), port=int(args.port), dry_run=bool(args.dry_run), **tuning)
         return 0
     if cmd == "knowledge-api":
         from ..api.knowledge_http_api import KnowledgeHttpApi
@@ -302,20 +329,18 @@ def main(argv: list[str] | None = None) -> int:
         sys.stderr.write(f"Knowledge API listening on http://{args.bind}:{args.port}\n")
         api.serve_forever()
         return 0
-    if cmd == "init-config":
-        return init_config_main(config_out=args.config_out)
-    if cmd == "check-api":
-        return check_api_main(config_path=args.config)
-    if cmd == "check-deps":
-        return check_deps_main()
-    if cmd == "clean":
-        return clean_main()
-    if cmd == "install":
-        return install_main(no_deps=not bool(args.with_deps))
-    if cmd == "wizard":
-        return wizard_main()
-
-    raise RuntimeError(f"未知命令：{cmd}")
+    admin_commands: dict[str, Callable[[], int]] = {
+        "init-config": lambda: init_config_main(config_out=args.config_out),
+        "check-api": lambda: check_api_main(config_path=args.config),
+        "check-deps": lambda: check_deps_main(deep=bool(args.deep)),
+        "clean": clean_main,
+        "install": lambda: install_main(no_deps=not bool(args.with_deps)),
+        "wizard": wizard_main,
+    }
+    handler = admin_commands.get(cmd)
+    if handler is None:
+        raise RuntimeError(f"未知命令：{cmd}")
+    return handler()
 
 
 if __name__ == "__main__":
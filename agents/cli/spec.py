@@ -3,10 +3,9 @@ from __future__ import annotations
 from pathlib import Path
 import sys
 
-import yaml
-
 from .common import generate_project_names, is_interactive, log, pick_project_name, select_knowledge_path, tool_run
 from ..storage.knowledge_store import open_knowledge_store
+from ..core import yaml_io
 from ..core.llm_factory import get_llm, load_llm_config
 from ..core.requirement_excavation_skill import RequirementExcavationSkill
 
@@ -33,7 +32,7 @@ def spec_main(
                 "details": {"hint": "请使用 --knowledge 指定，或在交互模式下输入"},
             }
         }
-        sys.stdout.write(yaml.safe_dump(payload, sort_keys=False, allow_unicode=True))
+        sys.stdout.write(yaml_io.safe_dump(payload))
         return 1
 
     store = open_knowledge_store(knowledge_file)
@@ -43,8 +42,8 @@ def spec_main(
         return 0
 
     log("正在加载配置并初始化 LLM...")
-    load_llm_config(config_path, strict=True)
-    llm = get_llm(config_path=config_path, strict=True)
+    cfg = load_llm_config(config_path, strict=True)
+    llm = get_llm(cfg=cfg)
     tool = RequirementExcavationSkill(llm=llm, config_path=config_path)
 
     surface = ("项目知识（按时间顺序）：\n" + store.transcript()) if store.transcript() else ""
@@ -75,7 +74,7 @@ def spec_main(
                 "details": {"hint": "请使用 --project-name 或 --project-name-index 或 --auto-pick-name"},
             }
         }
-        sys.stdout.write(yaml.safe_dump(payload, sort_keys=False, allow_unicode=True))
+        sys.stdout.write(yaml_io.safe_dump(payload))
         return 1
 
     store.project_name = chosen
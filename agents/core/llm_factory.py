@@ -8,13 +8,15 @@ from pathlib import Path
 import os
 import re
 import threading
-from typing import Any
-
-import httpx
-import yaml
+from typing import TYPE_CHECKING, Any
 
+from . import yaml_io
 from .types import LLMClient
 
+if TYPE_CHECKING:
+    import httpx
+
+
 @dataclass(frozen=True)
 class LLMConfig:
     provider: str = "openai"
@@ -51,6 +53,7 @@ _INLINE_KV_RE = re.compile(r"(?i)\b(api_?key|token|secret|password)\b\s*[:=]\s*(
 _TOKEN_PREFIX_RE = re.compile(
     r"\b(?:sk|xai|nvapi|ghp|glpat|hf)_[A-Za-z0-9_-]{10,}\b|\b(?:sk|xai|nvapi)-[A-Za-z0-9_-]{10,}\b|\bAIza[0-9A-Za-z_-]{20,}\b"
 )
+_SECRET_HINT_RE = re.compile(r"(?i)key|token|secret|password|bearer|sk[_-]|xai[_-]|nvapi[_-]|ghp_|glpat_|hf_|aiza")
 
 
 def _http_timeout_seconds() -> float:
@@ -67,14 +70,22 @@ def _http_timeout_seconds() -> float:
 
 
 def redact_secrets(text: str) -> str:
+    return redact_secrets_ex(text)[0]
+
+
+def redact_secrets_ex(text: str) -> tuple[str, bool]:
     if not text:
-        return text
-    out = str(text)
-    out = _AUTH_BEARER_RE.sub("authorization: Bearer <redacted>", out)
-    out = _SECRET_ASSIGN_RE.sub(lambda m: f"{m.group(1)}=<redacted>", out)
-    out = _INLINE_KV_RE.sub(lambda m: f"{m.group(1)}=<redacted>", out)
-    out = _TOKEN_PREFIX_RE.sub("<redacted>", out)
-    return out
+        return text, False
+    src = str(text)
+    if not _SECRET_HINT_RE.search(src):
+        return src, False
+    out, n1 = _AUTH_BEARER_RE.subn("authorization: Bearer <redacted>", src)
+    out, n2 = _SECRET_ASSIGN_RE.subn(lambda m: f"{m.group(1)}=<redacted>", out)
+    out, n3 = _INLINE_KV_RE.subn(lambda m: f"{m.group(1)}=<redacted>", out)
+    out, n4 = _TOKEN_PREFIX_RE.subn("<redacted>", out)
+    if not (n1 or n2 or n3 or n4):
+        return out, False
+    return out, out != src
 
 
 def redact_secrets_in_obj(obj: Any) -> Any:
@@ -107,7 +118,7 @@ def _redact_if_suspicious(value: str) -> str:
     return "<redacted>"
 
 
-def _get_shared_http_client() -> httpx.Client:
+def get_shared_http_client() -> httpx.Client:
     global _SHARED_HTTPX_CLIENT
     if _SHARED_HTTPX_CLIENT is not None:
         return _SHARED_HTTPX_CLIENT
@@ -116,6 +127,8 @@ def _get_shared_http_client() -> httpx.Client:
         if _SHARED_HTTPX_CLIENT is not None:
             return _SHARED_HTTPX_CLIENT
 
+        import httpx
+
         timeout_s = _http_timeout_seconds()
         timeout = httpx.Timeout(timeout=timeout_s, connect=min(30.0, timeout_s))
         try:
@@ -220,15 +233,17 @@ def _load_env_file(env_file: str, *, allowed_keys: set[str], config_dir: Path) -
 
 
 @functools.lru_cache(maxsize=32)
-def _load_llm_config_cached(resolved_path: str, mtime_ns: int, strict: bool) -> LLMConfig:
+def _load_llm_config_cached(resolved_path: str, mtime_ns: int, size: int, strict: bool) -> LLMConfig:
     return _load_llm_config_uncached(Path(resolved_path), strict=strict)
 
 
 def load_llm_config(path: str | os.PathLike[str] | None = None, *, strict: bool = False) -> LLMConfig:
     config_path = Path(path) if path else _default_config_path()
-    resolved_path = str(config_path.resolve()) if config_path.exists() else str(config_path)
-    mtime_ns = int(config_path.stat().st_mtime_ns) if config_path.exists() else -1
-    return _load_llm_config_cached(resolved_path, mtime_ns, strict)
+    try:
+        st = config_path.stat()
+    except OSError:
+        return _load_llm_config_cached(str(config_path), -1, -1, strict)
+    return _load_llm_config_cached(str(config_path.resolve()), st.st_mtime_ns, st.st_size, strict)
 
 
 def _load_llm_config_uncached(config_path: Path, *, strict: bool) -> LLMConfig:
@@ -251,7 +266,7 @@ def _load_llm_config_uncached(config_path: Path, *, strict: bool) -> LLMConfig:
         return LLMConfig(warnings=tuple(warnings))
 
     try:
-        data = yaml.safe_load(raw) or {}
+        data = yaml_io.safe_load(raw) or {}
     except Exception as e:
         _fail(f"LLM 配置文件解析失败：{config_path}（{e}）")
         return LLMConfig(warnings=tuple(warnings))
@@ -389,8 +404,15 @@ def _filter_kwargs(callable_obj: Any, kwargs: dict[str, Any]) -> dict[str, Any]:
     return {k: v for k, v in kwargs.items() if k in sig.parameters}
 
 
-def get_llm(*, config_path: str | os.PathLike[str] | None = None, strict: bool = True, **overrides: Any) -> LLMClient:
-    cfg = load_llm_config(config_path, strict=strict)
+def get_llm(
+    *,
+    config_path: str | os.PathLike[str] | None = None,
+    strict: bool = True,
+    cfg: LLMConfig | None = None,
+    **overrides: Any,
+) -> LLMClient:
+    if cfg is None:
+        cfg = load_llm_config(config_path, strict=strict)
     provider = cfg.provider.lower().strip()
 
     max_tokens = overrides.pop("max_tokens", cfg.max_tokens)
@@ -469,7 +491,7 @@ def get_llm(*, config_path: str | os.PathLike[str] | None = None, strict: bool =
 
         http_client = overrides.pop("http_client", None)
         if http_client is None:
-            http_client = _get_shared_http_client()
+            http_client = get_shared_http_client()
 
         kwargs = {
             "model": cfg.model,
@@ -494,7 +516,7 @@ def get_llm(*, config_path: str | os.PathLike[str] | None = None, strict: bool =
 
         http_client = overrides.pop("http_client", None)
         if http_client is None:
-            http_client = _get_shared_http_client()
+            http_client = get_shared_http_client()
 
         kwargs = {
             "model": cfg.model,
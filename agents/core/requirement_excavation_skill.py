@@ -2,8 +2,8 @@ from crewai.tools import BaseTool
 import json
 import os
 from typing import Any
-import yaml
 
+from . import yaml_io
 from .llm_factory import get_llm, load_llm_config, redact_secrets, redact_secrets_in_obj
 
 
@@ -47,7 +47,7 @@ class RequirementExcavationSkill(BaseTool):
         payload: dict[str, Any] = {"error": {"code": code, "message": message}}
         if details:
             payload["error"]["details"] = redact_secrets_in_obj(details)
-        return yaml.safe_dump(payload, sort_keys=False, allow_unicode=True)
+        return yaml_io.safe_dump(payload)
 
     def _truncate(self, text: str, limit: int) -> tuple[str, bool]:
         if limit <= 0:
@@ -204,5 +204,5 @@ class RequirementExcavationSkill(BaseTool):
         normalized["surface_problem"] = surface_problem_trimmed
         normalized["prompt_version"] = _PROMPT_VERSION
 
-        result_yaml = yaml.safe_dump(normalized, sort_keys=False, allow_unicode=True)
+        result_yaml = yaml_io.safe_dump(normalized)
         return result_yaml
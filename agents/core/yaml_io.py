@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from typing import Any
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as _Dumper, CSafeLoader as _Loader
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeDumper as _Dumper, SafeLoader as _Loader  # type: ignore[assignment]
+
+
+def safe_load(stream: Any) -> Any:
+    return yaml.load(stream, Loader=_Loader)
+
+
+def safe_dump(data: Any) -> str:
+    return yaml.dump(data, Dumper=_Dumper, sort_keys=False, allow_unicode=True)
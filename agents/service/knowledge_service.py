@@ -28,6 +28,14 @@ class KnowledgeSnapshot:
     latest_spec_yaml: str | None
     records: list[dict[str, Any]]
 
+    def to_json_dict(self) -> dict[str, Any]:
+        return {
+            "schema_version": self.schema_version,
+            "project_name": self.project_name,
+            "latest_spec_yaml": self.latest_spec_yaml,
+            "records": [dict(r) for r in self.records],
+        }
+
 
 class KnowledgeService:
     def __init__(self, *, base_dir: str | Path | None = None, default_path: str | Path | None = None):
@@ -63,13 +71,7 @@ class KnowledgeService:
         path = self.resolve_path(knowledge_path)
         store = open_knowledge_store(path)
         store.load()
-        n = 0
-        for item in items:
-            text = (item or "").strip()
-            if not text:
-                continue
-            store.append(role, text, autosave=False)
-            n += 1
+        n = store.extend(role, items, autosave=False)
         if n and (not dry_run):
             store.save()
         return n
@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 import sqlite3
-from typing import Any, Literal
+from typing import Any, Iterable, Iterator, Literal
 
 from .sqlite_store import BaseSqliteStore
 from .yaml_store import BaseYamlStore, parse_schema_version
@@ -81,12 +81,23 @@ class KnowledgeStore(BaseYamlStore):
         if autosave:
             self.save()
 
-    def transcript(self) -> str:
-        out: list[str] = []
+    def extend(self, role: Role, items: Iterable[str], *, autosave: bool = True) -> int:
+        ts = datetime.now(timezone.utc).isoformat()
+        new = [KnowledgeRecord(role=role, content=text, ts=ts) for item in items if (text := (item or "").strip())]
+        if not new:
+            return 0
+        self.records.extend(new)
+        if autosave:
+            self.save()
+        return len(new)
+
+    def iter_transcript(self) -> Iterator[str]:
         for r in self.records:
             name = "用户" if r.role == "user" else ("助手" if r.role == "assistant" else "系统")
-            out.append(f"{name}: {r.content}")
-        return "\n".join(out).strip()
+            yield f"{name}: {r.content}"
+
+    def transcript(self) -> str:
+        return "\n".join(self.iter_transcript()).strip()
 
 
 class SqliteKnowledgeStore(BaseSqliteStore):
@@ -148,17 +159,13 @@ class SqliteKnowledgeStore(BaseSqliteStore):
 
             if len(self.records) < self._persisted_count:
                 con.execute("DELETE FROM records")
-                for r in self.records:
-                    con.execute(
-                        "INSERT INTO records(role, content, ts) VALUES(?, ?, ?)",
-                        (r.role, r.content, r.ts),
-                    )
+                pending = self.records
             else:
-                for r in self.records[self._persisted_count :]:
-                    con.execute(
-                        "INSERT INTO records(role, content, ts) VALUES(?, ?, ?)",
-                        (r.role, r.content, r.ts),
-                    )
+                pending = self.records[self._persisted_count :]
+            con.executemany(
+                "INSERT INTO records(role, content, ts) VALUES(?, ?, ?)",
+                [(r.role, r.content, r.ts) for r in pending],
+            )
         self._persisted_count = len(self.records)
 
     def reset_session(self) -> None:
@@ -186,12 +193,28 @@ class SqliteKnowledgeStore(BaseSqliteStore):
                 )
             self._persisted_count = len(self.records)
 
-    def transcript(self) -> str:
-        out: list[str] = []
+    def extend(self, role: Role, items: Iterable[str], *, autosave: bool = True) -> int:
+        ts = datetime.now(timezone.utc).isoformat()
+        new = [KnowledgeRecord(role=role, content=text, ts=ts) for item in items if (text := (item or "").strip())]
+        if not new:
+            return 0
+        self.records.extend(new)
+        if autosave:
+            with self._transaction() as con:
+                con.executemany(
+                    "INSERT INTO records(role, content, ts) VALUES(?, ?, ?)",
+                    [(r.role, r.content, r.ts) for r in new],
+                )
+            self._persisted_count = len(self.records)
+        return len(new)
+
+    def iter_transcript(self) -> Iterator[str]:
         for r in self.records:
             name = "用户" if r.role == "user" else ("助手" if r.role == "assistant" else "系统")
-            out.append(f"{name}: {r.content}")
-        return "\n".join(out).strip()
+            yield f"{name}: {r.content}"
+
+    def transcript(self) -> str:
+        return "\n".join(self.iter_transcript()).strip()
 
 
 def open_knowledge_store(path: str | Path) -> KnowledgeStore | SqliteKnowledgeStore:
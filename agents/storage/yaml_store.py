@@ -6,7 +6,7 @@ from pathlib import Path
 from typing import Any
 import uuid
 
-import yaml
+from ..core import yaml_io
 
 
 def parse_schema_version(value: Any) -> int:
@@ -34,7 +34,7 @@ class BaseYamlStore:
             return None
         raw = self.path.read_text(encoding="utf-8")
         try:
-            data = yaml.safe_load(raw) or {}
+            data = yaml_io.safe_load(raw) or {}
         except Exception:
             self._backup_broken_file()
             self.schema_version = 1
@@ -55,7 +55,7 @@ class BaseYamlStore:
 
     def _atomic_save(self, payload: dict[str, Any]) -> None:
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        text = yaml.safe_dump(payload, sort_keys=False, allow_unicode=True)
+        text = yaml_io.safe_dump(payload)
         tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
         try:
             with open(tmp, "w", encoding="utf-8", newline="\n") as f:
@@ -1,17 +1,31 @@
 from __future__ import annotations
 
-from dataclasses import asdict
+from collections import OrderedDict, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 import base64
+import functools
 import hmac
 import json
 import os
+import socket
+import struct
 import tempfile
+import threading
+import time
+import weakref
+import zlib
 from http import HTTPStatus
-from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
-from typing import Any
+from socketserver import ThreadingMixIn
+from typing import Any, Callable, Iterable, Iterator, TypeVar
 from urllib.parse import urlparse
 
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
 from ..cli.common import (
     PROMPT_VERSION,
     generate_project_names,
@@ -21,43 +35,113 @@ from ..cli.common import (
     truncate_text,
 )
 from ..service.knowledge_service import KnowledgeService
-from ..storage.knowledge_store import open_knowledge_store
-from ..core.llm_factory import get_llm, load_llm_config, redact_secrets
-from ..core.requirement_excavation_skill import RequirementExcavationSkill
+from ..storage.knowledge_store import KnowledgeStore, SqliteKnowledgeStore, open_knowledge_store
+from ..core.llm_factory import LLMConfig, get_llm, load_llm_config, redact_secrets, redact_secrets_ex
 
 
 _DEFAULT_BIND = "127.0.0.1"
 _DEFAULT_PORT = 8788
 _MAX_BODY_BYTES_DEFAULT = 2 * 1024 * 1024
+_MAX_INFLIGHT_DEFAULT = min(32, (os.cpu_count() or 1) * 2 + 2)
+_REQUEST_SLOT_WAIT_S = 5.0
+_LLM_CONCURRENCY_DEFAULT = 4
+_KEEPALIVE_TIMEOUT_S = 15.0
+_LISTEN_BACKLOG = 128
+_HEALTH_BODY = b'{"ok":true}'
+_KNOWLEDGE_READ_TTL_S = 0.1
+_FILE_CACHE_MAX = 128
+_KNOWLEDGE_TAIL_CHARS = 4000
+_STREAM_RECORDS_MIN = 256
+_STREAM_CHUNK_BYTES = 64 * 1024
+_T = TypeVar("_T")
+_CHAT_ROLES: frozenset[str] = frozenset({"user", "assistant"})
+_WRITE_PATHS: frozenset[str] = frozenset({"/v1/prompt/write", "/v1/config/write", "/v1/chat/send"})
+_BODYLESS_PATHS: frozenset[str] = frozenset({"/v1/prompt/read"})
 
 
 _WEBUI_HTML_PATH = Path(__file__).resolve().parent / "static" / "webui.html"
+_WEBUI_PAGE_CACHE: tuple[tuple[int, int] | None, _WebUIPage] | None = None
+_GZIP_LEVEL = 9
+_GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
 
 
 def _make_nonce() -> str:
     return base64.b64encode(os.urandom(16)).decode("ascii")
 
 
-def _inject_nonce(html: str, nonce: str) -> str:
-    def _inject_first_tag(tag: str, doc: str) -> str:
-        lower = doc.lower()
+def _nonce_split_points(html: str) -> list[int]:
+    lower = html.lower()
+    points: list[int] = []
+    for tag in ("script", "style"):
         needle = f"<{tag}"
         start = lower.find(needle)
         if start < 0:
-            return doc
-        end = doc.find(">", start)
+            continue
+        end = html.find(">", start)
         if end < 0:
-            return doc
-        head = doc[start:end]
-        if "nonce=" in head.lower():
-            return doc
-        insert_at = start + len(needle)
-        return doc[:insert_at] + f' nonce="{nonce}"' + doc[insert_at:]
+            continue
+        if "nonce=" in lower[start:end]:
+            continue
+        points.append(start + len(needle))
+    return sorted(points)
+
+
+def _split_for_nonce(html: str) -> list[str]:
+    pieces: list[str] = []
+    prev = 0
+    for at in _nonce_split_points(html):
+        pieces.append(html[prev:at])
+        prev = at
+    pieces.append(html[prev:])
+    return pieces
+
+
+def _deflate_segment(raw: bytes, *, final: bool) -> bytes:
+    c = zlib.compressobj(_GZIP_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return c.compress(raw) + c.flush(zlib.Z_FINISH if final else zlib.Z_FULL_FLUSH)
+
 
-    out = html
-    out = _inject_first_tag("script", out)
-    out = _inject_first_tag("style", out)
-    return out
+class _WebUIPage:
+    def __init__(self, html: str):
+        self._pieces = [p.encode("utf-8") for p in _split_for_nonce(html)]
+        last = len(self._pieces) - 1
+        self._deflated = [_deflate_segment(p, final=(i == last)) for i, p in enumerate(self._pieces)]
+        self._pieces_len = sum(len(p) for p in self._pieces)
+
+    def render(self, nonce: str, *, gzip: bool = False) -> bytes:
+        attr = f' nonce="{nonce}"'.encode("ascii")
+        if not gzip:
+            return attr.join(self._pieces)
+        pieces = self._pieces
+        crc = zlib.crc32(pieces[0])
+        for p in pieces[1:]:
+            crc = zlib.crc32(p, zlib.crc32(attr, crc))
+        size = self._pieces_len + len(attr) * (len(pieces) - 1)
+        attr_deflated = _deflate_segment(attr, final=False)
+        trailer = struct.pack("<II", crc & 0xFFFFFFFF, size & 0xFFFFFFFF)
+        return _GZIP_HEADER + attr_deflated.join(self._deflated) + trailer
+
+
+def _accepts_gzip(header: str | None) -> bool:
+    wildcard: bool | None = None
+    for item in (header or "").lower().split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip()
+        if coding not in {"gzip", "x-gzip", "*"}:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = 0.0
+        if coding == "*":
+            wildcard = q > 0
+        else:
+            return q > 0
+    return bool(wildcard)
 
 
 def _load_webui_html() -> str:
@@ -82,6 +166,55 @@ npm run build:webui</pre>
 """
 
 
+def _load_webui_page() -> _WebUIPage:
+    global _WEBUI_PAGE_CACHE
+    try:
+        st = _WEBUI_HTML_PATH.stat()
+        key: tuple[int, int] | None = (st.st_mtime_ns, st.st_size)
+    except Exception:
+        key = None
+    cached = _WEBUI_PAGE_CACHE
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    page = _WebUIPage(_load_webui_html())
+    _WEBUI_PAGE_CACHE = (key, page)
+    return page
+
+
+class _ReqXHTTPServer(ThreadingMixIn, HTTPServer):
+    request_queue_size = _LISTEN_BACKLOG
+    daemon_threads = True
+    block_on_close = False
+
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        handler_cls: type[BaseHTTPRequestHandler],
+        *,
+        ctx: WebUIServer,
+        max_inflight_requests: int,
+    ):
+        self.ctx = ctx
+        if ":" in server_address[0]:
+            self.address_family = socket.AF_INET6
+        self._request_slots = threading.BoundedSemaphore(max(1, int(max_inflight_requests)))
+        super().__init__(server_address, handler_cls)
+
+    def server_bind(self) -> None:
+        if self.address_family == socket.AF_INET6 and hasattr(socket, "IPV6_V6ONLY"):
+            try:
+                self.socket.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 0)
+            except OSError:
+                pass
+        super().server_bind()
+
+    def acquire_request_slot(self) -> bool:
+        return self._request_slots.acquire(timeout=_REQUEST_SLOT_WAIT_S)
+
+    def release_request_slot(self) -> None:
+        self._request_slots.release()
+
+
 class _JsonError(Exception):
     def __init__(self, code: str, *, status: int = 400, message: str | None = None):
         super().__init__(code)
@@ -90,25 +223,46 @@ class _JsonError(Exception):
         self.message = message
 
 
-def _read_body(handler: BaseHTTPRequestHandler, *, limit: int) -> bytes:
-    raw_len = handler.headers.get("Content-Length", "")
-    try:
-        n = int(raw_len)
-    except Exception:
-        n = 0
+def _content_length(handler: BaseHTTPRequestHandler, *, limit: int) -> int:
+    if "chunked" in (handler.headers.get("Transfer-Encoding") or "").lower():
+        raise _JsonError("chunked_body_not_supported", status=411)
+    raw_len = handler.headers.get("Content-Length")
+    if raw_len is None:
+        return 0
+    if not (raw_len.isascii() and raw_len.isdigit()):
+        raise _JsonError("invalid_content_length", status=400)
+    n = int(raw_len, 10)
     if n <= 0:
-        return b""
+        return 0
     if n > limit:
         raise _JsonError("body_too_large", status=413)
-    return handler.rfile.read(n)
+    return n
+
+
+def _discard_body(handler: BaseHTTPRequestHandler, *, length: int) -> None:
+    while length > 0:
+        got = handler.rfile.read(min(length, 64 * 1024))
+        if not got:
+            return
+        length -= len(got)
 
 
-def _read_json(handler: BaseHTTPRequestHandler, *, limit: int) -> dict[str, Any]:
-    raw = _read_body(handler, limit=limit)
-    if not raw:
+def _read_json(handler: BaseHTTPRequestHandler, *, length: int) -> dict[str, Any]:
+    if length <= 0:
         return {}
+    buf = bytearray(length)
+    view = memoryview(buf)
+    pos = 0
+    while pos < length:
+        got = handler.rfile.readinto(view[pos:])
+        if not got:
+            break
+        pos += got
+    view.release()
+    if pos < length:
+        del buf[pos:]
     try:
-        obj = json.loads(raw.decode("utf-8"))
+        obj = _loads_json(buf)
     except Exception as e:
         raise _JsonError("invalid_json") from e
     if not isinstance(obj, dict):
@@ -138,10 +292,22 @@ def _apply_security_headers(handler: BaseHTTPRequestHandler, *, nonce: str | Non
     )
 
 
+def _loads_json(raw: bytes | bytearray) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _dumps_json(payload: dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
 def _write_json(
     handler: BaseHTTPRequestHandler, status: int, payload: dict[str, Any], *, headers: dict[str, str] | None = None
 ) -> None:
-    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    raw = _dumps_json(payload)
     handler.send_response(status)
     _apply_security_headers(handler)
     handler.send_header("Content-Type", "application/json; charset=utf-8")
@@ -152,16 +318,64 @@ def _write_json(
     handler.wfile.write(raw)
 
 
-def _write_text(
+@functools.lru_cache(maxsize=64)
+def _error_body(code: str) -> bytes:
+    return b'{"ok":false,"error":{"code":"' + code.encode("ascii") + b'"}}'
+
+
+def _write_error(
+    handler: BaseHTTPRequestHandler, status: int, code: str, *, headers: dict[str, str] | None = None
+) -> None:
+    _write_bytes(handler, status, _error_body(code), content_type="application/json; charset=utf-8", headers=headers)
+
+
+def _write_json_stream(handler: BaseHTTPRequestHandler, status: int, parts: Iterable[bytes]) -> None:
+    handler.send_response(status)
+    _apply_security_headers(handler)
+    handler.send_header("Content-Type", "application/json; charset=utf-8")
+    handler.send_header("Transfer-Encoding", "chunked")
+    handler.end_headers()
+    out = handler.wfile
+    buf = bytearray()
+    try:
+        for part in parts:
+            buf += part
+            if len(buf) >= _STREAM_CHUNK_BYTES:
+                out.write(b"%x\r\n%s\r\n" % (len(buf), buf))
+                buf.clear()
+    except Exception:
+        # Headers are already out; drop the connection without the final chunk so the
+        # client sees a truncated body instead of a second response glued onto the first.
+        handler.close_connection = True
+        return
+    if buf:
+        out.write(b"%x\r\n%s\r\n" % (len(buf), buf))
+    out.write(b"0\r\n\r\n")
+
+
+def _knowledge_read_parts(result: dict[str, Any]) -> Iterator[bytes]:
+    """Encode a knowledge read result record by record.
+
+    Only the encoded JSON text is streamed. The records list itself is fully
+    built by ``_read_knowledge`` and kept in its short-lived cache, so peak
+    memory drops by the size of the serialized body, not the records.
+    """
+    head = {k: v for k, v in result.items() if k != "records"}
+    yield b'{"ok":true,"result":' + _dumps_json(head)[:-1] + (b',"records":[' if head else b'"records":[')
+    for i, rec in enumerate(result.get("records") or ()):
+        yield b"," + _dumps_json(rec) if i else _dumps_json(rec)
+    yield b"]}}"
+
+
+def _write_bytes(
     handler: BaseHTTPRequestHandler,
     status: int,
-    body: str,
+    raw: bytes,
     *,
     content_type: str,
     headers: dict[str, str] | None = None,
     nonce: str | None = None,
 ) -> None:
-    raw = body.encode("utf-8")
     handler.send_response(status)
     _apply_security_headers(handler, nonce=nonce)
     handler.send_header("Content-Type", content_type)
@@ -174,49 +388,69 @@ def _write_text(
 
 def _resolve_under(base_dir: Path, path: str | None, *, default_name: str) -> Path:
     raw = (path or "").strip() or default_name
-    p = Path(raw)
-    if not p.is_absolute():
-        p = base_dir / p
-    resolved = p.expanduser().resolve()
-    try:
-        resolved.relative_to(base_dir)
-    except Exception as e:
-        raise _JsonError("path_outside_repo", status=400) from e
-    return resolved
+    base = str(base_dir)
+    resolved = os.path.realpath(os.path.join(base, raw))
+    if resolved != base and not resolved.startswith(base.rstrip(os.sep) + os.sep):
+        raise _JsonError("path_outside_repo", status=400)
+    return Path(resolved)
 
 
-def _require_yaml_path(path: Path) -> None:
-    if path.suffix.lower() not in {".yaml", ".yml"}:
+def _resolve_config_path(base_dir: Path, path: Any) -> Path:
+    resolved = _resolve_under(base_dir, path if isinstance(path, str) else None, default_name="llm.yaml")
+    if resolved.suffix.lower() not in {".yaml", ".yml"}:
         raise _JsonError("path_must_be_yaml", status=400)
-    if path.exists() and path.is_dir():
+    if resolved.is_dir():
         raise _JsonError("path_is_directory", status=400)
+    return resolved
 
 
 def _atomic_write_text(path: Path, text: str) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    raw = text.rstrip() + "\n"
-    tmp_path: Path | None = None
+    data = (text.rstrip() + "\n").encode("utf-8")
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=path.name + ".", suffix=".tmp")
     try:
-        with tempfile.NamedTemporaryFile(
-            mode="w",
-            encoding="utf-8",
-            newline="\n",
-            delete=False,
-            dir=str(path.parent),
-            prefix=path.name + ".",
-            suffix=".tmp",
-        ) as f:
-            f.write(raw)
-            f.flush()
-            os.fsync(f.fileno())
-            tmp_path = Path(f.name)
-        os.replace(tmp_path, path)
-    finally:
-        if tmp_path and tmp_path.exists():
-            try:
-                tmp_path.unlink()
-            except Exception:
-                pass
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view) :]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _tail_lines(lines: Iterable[str], limit: int) -> str:
+    kept: deque[str] = deque()
+    size = -1
+    for line in lines:
+        kept.append(line)
+        size += len(line) + 1
+        while len(kept) > 1 and size - len(kept[0]) - 1 >= limit:
+            size -= len(kept.popleft()) + 1
+    return truncate_text("\n".join(kept), limit, keep="tail")
+
+
+_WEB_CHAT_RULES = (
+    "\n"
+    "你现在处于 WebUI chat 模式：你的目标是通过多轮问答澄清需求。\n"
+    "规则：\n"
+    "- 允许输出 Markdown；若全局提示词与此冲突，以此处为准。\n"
+    "- 不要输出 JSON/YAML 规格文档。\n"
+    "- “项目知识”用于后续生成：是否写入、写入什么由你决定。\n"
+    "- 当你认为某条信息已经稳定、对后续生成很关键时，在回复末尾额外输出一行：\n"
+    '  <KNOWLEDGE>{"append":["...","..."]}</KNOWLEDGE>\n'
+    "  该行仅供程序解析并写入项目知识文件，不会展示给用户；不要写入任何密钥或敏感信息。\n"
+    "历史上下文（可选，来自本地导入的内容，供你参考但不要复述全文）：\n"
+)
+_WEB_CHAT_KNOWLEDGE_HEADER = "\n已有项目知识（可能来自历史会话，供你引用但不要复述全文）：\n"
+_WEB_CHAT_HISTORY_HEADER = "\n本轮对话记录：\n"
+_WEB_CHAT_TAIL = "\n请输出你的下一句话（只输出对用户可见内容）："
 
 
 def _build_web_chat_prompt(
@@ -226,33 +460,22 @@ def _build_web_chat_prompt(
     project_knowledge: str,
     imported_context: str,
 ) -> str:
-    history: list[str] = []
-    for role, content in messages:
-        c = (content or "").strip()
-        if not c:
-            continue
-        r = "用户" if role == "user" else "助手"
-        history.append(f"{r}: {c}")
-    history_text = "\n".join(history)
-    knowledge = truncate_text(project_knowledge, 4000, keep="tail")
+    knowledge = project_knowledge
     context = truncate_text(imported_context, 4000, keep="tail")
-    return (
-        f"{global_prompt}\n"
-        "你现在处于 WebUI chat 模式：你的目标是通过多轮问答澄清需求。\n"
-        "规则：\n"
-        "- 允许输出 Markdown；若全局提示词与此冲突，以此处为准。\n"
-        "- 不要输出 JSON/YAML 规格文档。\n"
-        "- “项目知识”用于后续生成：是否写入、写入什么由你决定。\n"
-        "- 当你认为某条信息已经稳定、对后续生成很关键时，在回复末尾额外输出一行：\n"
-        '  <KNOWLEDGE>{"append":["...","..."]}</KNOWLEDGE>\n'
-        "  该行仅供程序解析并写入项目知识文件，不会展示给用户；不要写入任何密钥或敏感信息。\n"
-        "历史上下文（可选，来自本地导入的内容，供你参考但不要复述全文）：\n"
-        f"{context}\n"
-        "已有项目知识（可能来自历史会话，供你引用但不要复述全文）：\n"
-        f"{knowledge}\n"
-        "本轮对话记录：\n"
-        f"{history_text}\n"
-        "请输出你的下一句话（只输出对用户可见内容）："
+    history = "\n".join(
+        [("用户: " if role == "user" else "助手: ") + c for role, content in messages if (c := (content or "").strip())]
+    )
+    return "".join(
+        (
+            global_prompt,
+            _WEB_CHAT_RULES,
+            context,
+            _WEB_CHAT_KNOWLEDGE_HEADER,
+            knowledge,
+            _WEB_CHAT_HISTORY_HEADER,
+            history,
+            _WEB_CHAT_TAIL,
+        )
     )
 
 
@@ -267,352 +490,555 @@ class WebUIServer:
         token_env: str | None = "REQX_WEB_TOKEN",
         token_value: str | None = None,
         max_body_bytes: int = _MAX_BODY_BYTES_DEFAULT,
+        max_inflight_requests: int = _MAX_INFLIGHT_DEFAULT,
+        llm_concurrency: int = _LLM_CONCURRENCY_DEFAULT,
+        llm_timeout_s: float | None = None,
     ):
         self.repo_root = Path(repo_root).expanduser().resolve()
         self.bind = bind
         self.port = port
         self.dry_run = dry_run
         self.max_body_bytes = max_body_bytes
+        self.max_inflight_requests = max_inflight_requests
+        self.llm_timeout_s = llm_timeout_s
+        self._llm_slots = threading.BoundedSemaphore(max(1, int(llm_concurrency)))
         self._token: str | None = token_value
         if self._token is None and token_env:
             self._token = os.getenv(token_env) or None
+        self._token_bytes: bytes = (self._token or "").encode("utf-8")
         self._knowledge_service = KnowledgeService(base_dir=self.repo_root, default_path=self.repo_root / "project_knowledge.db")
         self._prompt_path = self.repo_root / "agents" / "global_prompt.txt"
+        self._file_cache: OrderedDict[tuple[str, str], tuple[tuple[int, int], Any]] = OrderedDict()
+        self._file_cache_lock = threading.Lock()
+        self._knowledge_lock = threading.Lock()
+        self._knowledge_inflight: dict[str, threading.Event] = {}
+        self._knowledge_recent: dict[str, tuple[float, dict[str, Any]]] = {}
+        self._ks_cache: dict[str, tuple[Any, KnowledgeStore | SqliteKnowledgeStore, threading.Lock]] = {}
+        self._ks_cache_lock = threading.Lock()
+        self._ks_tail: weakref.WeakKeyDictionary[Any, tuple[list[Any], int, str]] = weakref.WeakKeyDictionary()
+        self._ks_tail_lock = threading.Lock()
+
+    def _cached_load(self, path: Path, loader: Callable[[Path], _T], *, kind: str) -> _T:
+        st = path.stat()
+        key = (st.st_mtime_ns, st.st_size)
+        cache_key = (str(path), kind)
+        with self._file_cache_lock:
+            cached = self._file_cache.get(cache_key)
+            if cached is not None:
+                self._file_cache.move_to_end(cache_key)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        value = loader(path)
+        with self._file_cache_lock:
+            self._file_cache[cache_key] = (key, value)
+            self._file_cache.move_to_end(cache_key)
+            while len(self._file_cache) > _FILE_CACHE_MAX:
+                self._file_cache.popitem(last=False)
+        return value
+
+    def _get_llm(self, cfg_path: Path) -> Any:
+        return self._cached_load(cfg_path, lambda p: get_llm(cfg=self._load_cfg(p)[0]), kind="llm")
+
+    def _load_cfg(self, path: Path) -> tuple[LLMConfig, dict[str, Any]]:
+        return self._cached_load(path, self._build_cfg_payload, kind="llm_config")
+
+    def _build_cfg_payload(self, path: Path) -> tuple[LLMConfig, dict[str, Any]]:
+        cfg = load_llm_config(str(path), strict=True)
+        payload: dict[str, Any] = {
+            "provider": cfg.provider,
+            "model": cfg.model,
+            "temperature": cfg.temperature,
+            "max_tokens": cfg.max_tokens,
+            "input_char_limit": cfg.input_char_limit,
+            "output_char_limit": cfg.output_char_limit,
+            "base_url": cfg.base_url,
+            "env_file": cfg.env_file,
+            "prompt_version": PROMPT_VERSION,
+        }
+        return cfg, {k: redact_secrets(v) if isinstance(v, str) else v for k, v in payload.items()}
+
+    def _read_text_redacted(self, path: Path) -> tuple[str, bool]:
+        return self._cached_load(path, lambda p: redact_secrets_ex(p.read_text(encoding="utf-8")), kind="text_redacted")
+
+    def _read_knowledge(self, knowledge_path: str | None) -> dict[str, Any]:
+        path = self._knowledge_service.resolve_path(knowledge_path)
+        key = str(path)
+        while True:
+            with self._knowledge_lock:
+                hit = self._knowledge_recent.get(key)
+                if hit is not None and time.monotonic() - hit[0] < _KNOWLEDGE_READ_TTL_S:
+                    return hit[1]
+                event = self._knowledge_inflight.get(key)
+                leader = event is None
+                if event is None:
+                    event = threading.Event()
+                    self._knowledge_inflight[key] = event
+            if not leader:
+                event.wait()
+                continue
+            try:
+                result = self._knowledge_service.read(path).to_json_dict()
+                with self._knowledge_lock:
+                    now = time.monotonic()
+                    expired = [k for k, (ts, _r) in self._knowledge_recent.items() if now - ts >= _KNOWLEDGE_READ_TTL_S]
+                    for k in expired:
+                        del self._knowledge_recent[k]
+                    self._knowledge_recent[key] = (now, result)
+                return result
+            finally:
+                with self._knowledge_lock:
+                    self._knowledge_inflight.pop(key, None)
+                event.set()
+
+    def _forget_knowledge(self, path: Path) -> None:
+        with self._knowledge_lock:
+            self._knowledge_recent.pop(str(path), None)
+
+    @staticmethod
+    def _ks_stamp(path: Path) -> tuple[tuple[int, int] | None, ...]:
+        stamps: list[tuple[int, int] | None] = []
+        for p in (path, path.with_name(path.name + "-wal")):
+            try:
+                st = p.stat()
+                stamps.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def _get_ks(self, path: Path) -> tuple[KnowledgeStore | SqliteKnowledgeStore, threading.Lock]:
+        key = str(path)
+        stamp = self._ks_stamp(path)
+        with self._ks_cache_lock:
+            entry = self._ks_cache.get(key)
+        if entry is not None and entry[0] == stamp:
+            return entry[1], entry[2]
+        ks = open_knowledge_store(path)
+        ks.load()
+        if isinstance(ks, SqliteKnowledgeStore):
+            ks.close()
+        lock = entry[2] if entry is not None else threading.Lock()
+        with self._ks_cache_lock:
+            self._ks_cache[key] = (self._ks_stamp(path), ks, lock)
+        return ks, lock
+
+    def _save_ks(self, path: Path, ks: KnowledgeStore | SqliteKnowledgeStore) -> None:
+        key = str(path)
+        try:
+            ks.save()
+        except Exception:
+            with self._ks_cache_lock:
+                entry = self._ks_cache.get(key)
+                if entry is not None and entry[1] is ks:
+                    del self._ks_cache[key]
+            self._forget_knowledge(path)
+            raise
+        finally:
+            if isinstance(ks, SqliteKnowledgeStore):
+                ks.close()
+        with self._ks_cache_lock:
+            entry = self._ks_cache.get(key)
+            if entry is not None and entry[1] is ks:
+                self._ks_cache[key] = (self._ks_stamp(path), ks, entry[2])
+        self._forget_knowledge(path)
+
+    def _knowledge_tail(self, ks: KnowledgeStore | SqliteKnowledgeStore) -> str:
+        records = ks.records
+        with self._ks_tail_lock:
+            hit = self._ks_tail.get(ks)
+        if hit is not None and hit[0] is records and hit[1] == len(records):
+            return hit[2]
+        tail = _tail_lines(ks.iter_transcript(), _KNOWLEDGE_TAIL_CHARS)
+        with self._ks_tail_lock:
+            self._ks_tail[ks] = (records, len(records), tail)
+        return tail
+
+    def _invoke_llm(self, call: Callable[..., _T], *args: Any) -> _T:
+        if not self._llm_slots.acquire(blocking=False):
+            raise _JsonError("llm_busy", status=503)
+        fut: Future[_T] = Future()
+
+        def run() -> None:
+            try:
+                fut.set_result(call(*args))
+            except BaseException as e:
+                fut.set_exception(e)
+            finally:
+                self._llm_slots.release()
+
+        threading.Thread(target=run, name="reqx-llm", daemon=True).start()
+        try:
+            return fut.result(timeout=self.llm_timeout_s)
+        except FutureTimeoutError as e:
+            raise _JsonError("llm_timeout", status=504) from e
 
     def read_global_prompt(self) -> str:
-        if self._prompt_path.exists():
-            return self._prompt_path.read_text(encoding="utf-8").strip()
-        return load_global_prompt()
-
-    def create_server(self) -> ThreadingHTTPServer:
-        handler = self._make_handler()
-        return ThreadingHTTPServer((self.bind, self.port), handler)
-
-    def _make_handler(self) -> type[BaseHTTPRequestHandler]:
-        server = self
-
-        class Handler(BaseHTTPRequestHandler):
-            server_version = "ReqXWebUI/1"
-
-            def log_message(self, format: str, *args: Any) -> None:
-                super().log_message(format, *args)
-
-            def _bearer_token(self) -> str | None:
-                auth = (self.headers.get("Authorization") or "").strip()
-                if not auth:
-                    return None
-                parts = auth.split()
-                if len(parts) != 2:
-                    return None
-                if parts[0].lower() != "bearer":
-                    return None
-                return parts[1].strip() or None
-
-            def _require_auth(self, *, allow_if_no_token: bool) -> None:
-                expected = server._token
-                if not expected:
-                    if allow_if_no_token:
-                        return
-                    raise _JsonError("token_required", status=401)
-                got = self._bearer_token()
-                if not got or not hmac.compare_digest(got, expected):
-                    raise _JsonError("unauthorized", status=401)
-
-            def do_GET(self) -> None:
-                try:
-                    parsed = urlparse(self.path)
-                    if parsed.path == "/" or parsed.path == "/index.html":
-                        nonce = _make_nonce()
-                        html = _inject_nonce(_load_webui_html(), nonce)
-                        _write_text(self, 200, html, content_type="text/html; charset=utf-8", nonce=nonce)
-                        return
-                    if parsed.path == "/favicon.ico":
-                        self.send_response(204)
-                        _apply_security_headers(self)
-                        self.end_headers()
-                        return
-                    if parsed.path == "/health":
-                        _write_json(self, 200, {"ok": True})
-                        return
-                    raise _JsonError("not_found", status=404)
-                except _JsonError as e:
-                    headers: dict[str, str] = {}
-                    if e.status == 401:
-                        headers["WWW-Authenticate"] = "Bearer"
-                    _write_json(self, e.status, {"ok": False, "error": {"code": e.code}}, headers=headers or None)
-                except Exception:
-                    _write_json(self, 500, {"ok": False, "error": {"code": "internal_error"}})
-
-            def do_POST(self) -> None:
-                try:
-                    parsed = urlparse(self.path)
-                    write_paths = {"/v1/prompt/write", "/v1/config/write", "/v1/chat/send"}
-                    self._require_auth(allow_if_no_token=parsed.path not in write_paths)
-                    body = _read_json(self, limit=server.max_body_bytes)
-
-                    if parsed.path == "/v1/knowledge/read":
-                        kp = body.get("knowledge_path")
-                        snap = server._knowledge_service.read(kp if isinstance(kp, str) and kp.strip() else None)
-                        _write_json(self, 200, {"ok": True, "result": asdict(snap)})
-                        return
-
-                    if parsed.path == "/v1/prompt/read":
-                        content = server.read_global_prompt()
-                        content_redacted = redact_secrets(content)
-                        _write_json(
-                            self,
-                            200,
-                            {
-                                "ok": True,
-                                "result": {
-                                    "content": content_redacted,
-                                    "prompt_version": PROMPT_VERSION,
-                                    "warning": "content_redacted" if content_redacted != content else None,
-                                },
+        try:
+            return self._cached_load(self._prompt_path, lambda p: p.read_text(encoding="utf-8").strip(), kind="prompt")
+        except FileNotFoundError:
+            return load_global_prompt()
+
+    def read_global_prompt_redacted(self) -> tuple[str, bool]:
+        try:
+            return self._cached_load(
+                self._prompt_path, lambda _p: redact_secrets_ex(self.read_global_prompt()), kind="prompt_redacted"
+            )
+        except FileNotFoundError:
+            return redact_secrets_ex(load_global_prompt())
+
+    def create_server(self) -> HTTPServer:
+        return _ReqXHTTPServer((self.bind, self.port), _ReqXHandler, ctx=self, max_inflight_requests=self.max_inflight_requests)
+
+    def serve_forever(self) -> None:
+        with self.create_server() as httpd:
+            httpd.serve_forever()
+
+
+class _ReqXHandler(BaseHTTPRequestHandler):
+    server: _ReqXHTTPServer
+    server_version = "ReqXWebUI/1"
+    protocol_version = "HTTP/1.1"
+    timeout = _KEEPALIVE_TIMEOUT_S
+    rbufsize = 64 * 1024
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        super().log_message(format, *args)
+
+    def _bearer_token(self) -> str | None:
+        auth = self.headers.get("Authorization")
+        if not auth or len(auth) < 8 or auth[:7].lower() != "bearer ":
+            return None
+        return auth[7:].strip() or None
+
+    def _require_auth(self, *, allow_if_no_token: bool) -> None:
+        ctx = self.server.ctx
+        if not ctx._token:
+            if allow_if_no_token:
+                return
+            raise _JsonError("token_required", status=401)
+        got = self._bearer_token()
+        if not got or not hmac.compare_digest(got.encode("utf-8"), ctx._token_bytes):
+            raise _JsonError("unauthorized", status=401)
+
+    def do_GET(self) -> None:
+        try:
+            parsed = urlparse(self.path)
+            if parsed.path == "/" or parsed.path == "/index.html":
+                nonce = _make_nonce()
+                gz = _accepts_gzip(self.headers.get("Accept-Encoding"))
+                raw = _load_webui_page().render(nonce, gzip=gz)
+                headers = {"Vary": "Accept-Encoding"}
+                if gz:
+                    headers["Content-Encoding"] = "gzip"
+                _write_bytes(
+                    self, 200, raw, content_type="text/html; charset=utf-8", headers=headers, nonce=nonce
+                )
+                return
+            if parsed.path == "/favicon.ico":
+                self.send_response(204)
+                _apply_security_headers(self)
+                self.end_headers()
+                return
+            if parsed.path == "/health":
+                _write_bytes(self, 200, _HEALTH_BODY, content_type="application/json; charset=utf-8")
+                return
+            raise _JsonError("not_found", status=404)
+        except _JsonError as e:
+            headers: dict[str, str] = {}
+            if e.status == 401:
+                headers["WWW-Authenticate"] = "Bearer"
+            _write_error(self, e.status, e.code, headers=headers or None)
+        except Exception:
+            _write_error(self, 500, "internal_error")
+
+    def do_POST(self) -> None:
+        ctx = self.server.ctx
+        body_read = False
+        slot = False
+        try:
+            parsed = urlparse(self.path)
+            length = _content_length(self, limit=ctx.max_body_bytes)
+            self._require_auth(allow_if_no_token=parsed.path not in _WRITE_PATHS)
+            body_read = True
+            if parsed.path in _BODYLESS_PATHS:
+                _discard_body(self, length=length)
+                body: dict[str, Any] = {}
+            else:
+                body = _read_json(self, length=length)
+            slot = self.server.acquire_request_slot()
+            if not slot:
+                raise _JsonError("server_busy", status=503)
+
+            if parsed.path == "/v1/knowledge/read":
+                kp = body.get("knowledge_path")
+                result = ctx._read_knowledge(kp if isinstance(kp, str) and kp.strip() else None)
+                if self.request_version == "HTTP/1.1" and len(result.get("records") or ()) >= _STREAM_RECORDS_MIN:
+                    _write_json_stream(self, 200, _knowledge_read_parts(result))
+                else:
+                    _write_json(self, 200, {"ok": True, "result": result})
+                return
+
+            if parsed.path == "/v1/prompt/read":
+                content_redacted, redacted = ctx.read_global_prompt_redacted()
+                _write_json(
+                    self,
+                    200,
+                    {
+                        "ok": True,
+                        "result": {
+                            "content": content_redacted,
+                            "prompt_version": PROMPT_VERSION,
+                            "warning": "content_redacted" if redacted else None,
+                        },
+                    },
+                )
+                return
+
+            if parsed.path == "/v1/prompt/write":
+                text = body.get("content")
+                if not isinstance(text, str):
+                    raise _JsonError("missing_or_invalid_content")
+                dry_run = bool(body.get("dry_run")) or ctx.dry_run
+                if not dry_run:
+                    _atomic_write_text(ctx._prompt_path, text)
+                _write_json(self, 200, {"ok": True, "result": {"dry_run": bool(dry_run)}})
+                return
+
+            if parsed.path == "/v1/config/read":
+                p = body.get("path")
+                path = _resolve_config_path(ctx.repo_root, p)
+                content_redacted, redacted = ctx._read_text_redacted(path) if path.exists() else ("", False)
+                _write_json(
+                    self,
+                    200,
+                    {
+                        "ok": True,
+                        "result": {
+                            "path": str(path),
+                            "content": content_redacted,
+                            "warning": "content_redacted" if redacted else None,
+                        },
+                    },
+                )
+                return
+
+            if parsed.path == "/v1/config/write":
+                p = body.get("path")
+                content = body.get("content")
+                if not isinstance(content, str):
+                    raise _JsonError("missing_or_invalid_content")
+                path = _resolve_config_path(ctx.repo_root, p)
+                dry_run = bool(body.get("dry_run")) or ctx.dry_run
+                if not dry_run:
+                    _atomic_write_text(path, content)
+                _write_json(self, 200, {"ok": True, "result": {"path": str(path), "dry_run": bool(dry_run)}})
+                return
+
+            if parsed.path == "/v1/config/doctor":
+                p = body.get("path")
+                path = _resolve_config_path(ctx.repo_root, p)
+                if not path.exists():
+                    raise _JsonError("config_not_found", status=404)
+                _cfg, payload = ctx._load_cfg(path)
+                _write_json(self, 200, {"ok": True, "result": dict(payload)})
+                return
+
+            if parsed.path == "/v1/chat/send":
+                cfg_path_raw = body.get("config_path")
+                kp_raw = body.get("knowledge_path")
+                imported = body.get("imported_context") or ""
+                dry_run = bool(body.get("dry_run"))
+                msgs = body.get("messages") or []
+                if not isinstance(imported, str):
+                    imported = ""
+                if not isinstance(msgs, list):
+                    raise _JsonError("missing_or_invalid_messages")
+                messages: list[tuple[str, str]] = [
+                    (r, c)
+                    for m in msgs
+                    if isinstance(m, dict)
+                    for r in (m.get("role"),)
+                    if r in _CHAT_ROLES
+                    for c in (m.get("content"),)
+                    if isinstance(c, str) and c.strip()
+                ]
+                if not messages or messages[-1][0] != "user":
+                    raise _JsonError("missing_or_invalid_messages")
+
+                cmd = (messages[-1][1] or "").strip().lower()
+
+                cfg_path = _resolve_config_path(ctx.repo_root, cfg_path_raw)
+                if not cfg_path.exists():
+                    raise _JsonError("config_not_found", status=404)
+                knowledge_path = (
+                    ctx._knowledge_service.resolve_path(kp_raw if isinstance(kp_raw, str) and kp_raw.strip() else None)
+                )
+
+                ks, ks_lock = ctx._get_ks(knowledge_path)
+                persist = not (dry_run or ctx.dry_run)
+
+                if cmd in {"/exit", "/quit"}:
+                    _write_json(
+                        self,
+                        200,
+                        {
+                            "ok": True,
+                            "result": {"reply": "已退出。", "knowledge_appended": 0, "dry_run": bool(dry_run or ctx.dry_run)},
+                        },
+                    )
+                    return
+                if cmd in {"/help", "/h"}:
+                    _write_json(
+                        self,
+                        200,
+                        {
+                            "ok": True,
+                            "result": {
+                                "reply": (
+                                    "命令说明：\n"
+                                    "- /spec: 基于项目知识生成需求 YAML（不结束）\n"
+                                    "- /done: 生成需求 YAML → 生成 10 个项目名（默认选第 1 个）\n"
+                                    "- /show: 显示当前项目知识\n"
+                                    "- /reset: 清空本次页面对话记录\n"
+                                    "- /exit: 退出\n"
+                                ),
+                                "knowledge_appended": 0,
+                                "dry_run": bool(dry_run or ctx.dry_run),
                             },
-                        )
-                        return
-
-                    if parsed.path == "/v1/prompt/write":
-                        text = body.get("content")
-                        if not isinstance(text, str):
-                            raise _JsonError("missing_or_invalid_content")
-                        dry_run = bool(body.get("dry_run")) or server.dry_run
-                        if not dry_run:
-                            _atomic_write_text(server._prompt_path, text)
-                        _write_json(self, 200, {"ok": True, "result": {"dry_run": bool(dry_run)}})
-                        return
-
-                    if parsed.path == "/v1/config/read":
-                        p = body.get("path")
-                        path = _resolve_under(server.repo_root, p if isinstance(p, str) else None, default_name="llm.yaml")
-                        _require_yaml_path(path)
-                        content = path.read_text(encoding="utf-8") if path.exists() else ""
-                        content_redacted = redact_secrets(content)
-                        _write_json(
-                            self,
-                            200,
-                            {
-                                "ok": True,
-                                "result": {
-                                    "path": str(path),
-                                    "content": content_redacted,
-                                    "warning": "content_redacted" if content_redacted != content else None,
-                                },
+                        },
+                    )
+                    return
+                if cmd == "/reset":
+                    _write_json(
+                        self,
+                        200,
+                        {
+                            "ok": True,
+                            "result": {
+                                "reply": "本轮对话记录已清空（仅影响本页面显示）。\n",
+                                "knowledge_appended": 0,
+                                "dry_run": bool(dry_run or ctx.dry_run),
                             },
-                        )
-                        return
-
-                    if parsed.path == "/v1/config/write":
-                        p = body.get("path")
-                        content = body.get("content")
-                        if not isinstance(content, str):
-                            raise _JsonError("missing_or_invalid_content")
-                        path = _resolve_under(server.repo_root, p if isinstance(p, str) else None, default_name="llm.yaml")
-                        _require_yaml_path(path)
-                        dry_run = bool(body.get("dry_run")) or server.dry_run
-                        if not dry_run:
-                            _atomic_write_text(path, content)
-                        _write_json(self, 200, {"ok": True, "result": {"path": str(path), "dry_run": bool(dry_run)}})
-                        return
-
-                    if parsed.path == "/v1/config/doctor":
-                        p = body.get("path")
-                        path = _resolve_under(server.repo_root, p if isinstance(p, str) else None, default_name="llm.yaml")
-                        _require_yaml_path(path)
-                        if not path.exists():
-                            raise _JsonError("config_not_found", status=404)
-                        cfg = load_llm_config(str(path), strict=True)
-                        payload: dict[str, Any] = {
-                            "provider": cfg.provider,
-                            "model": cfg.model,
-                            "temperature": cfg.temperature,
-                            "max_tokens": cfg.max_tokens,
-                            "input_char_limit": cfg.input_char_limit,
-                            "output_char_limit": cfg.output_char_limit,
-                            "base_url": cfg.base_url,
-                            "env_file": cfg.env_file,
-                            "prompt_version": PROMPT_VERSION,
-                        }
-                        for k, v in list(payload.items()):
-                            if isinstance(v, str):
-                                payload[k] = redact_secrets(v)
-                        _write_json(self, 200, {"ok": True, "result": payload})
-                        return
-
-                    if parsed.path == "/v1/chat/send":
-                        cfg_path_raw = body.get("config_path")
-                        kp_raw = body.get("knowledge_path")
-                        imported = body.get("imported_context") or ""
-                        dry_run = bool(body.get("dry_run"))
-                        msgs = body.get("messages") or []
-                        if not isinstance(imported, str):
-                            imported = ""
-                        if not isinstance(msgs, list):
-                            raise _JsonError("missing_or_invalid_messages")
-                        messages: list[tuple[str, str]] = []
-                        for m in msgs:
-                            if not isinstance(m, dict):
-                                continue
-                            role = m.get("role")
-                            content = m.get("content")
-                            if role not in {"user", "assistant"}:
-                                continue
-                            if not isinstance(content, str) or not content.strip():
-                                continue
-                            messages.append((role, content))
-                        if not messages or messages[-1][0] != "user":
-                            raise _JsonError("missing_or_invalid_messages")
-
-                        cmd = (messages[-1][1] or "").strip().lower()
-
-                        cfg_path = _resolve_under(
-                            server.repo_root, cfg_path_raw if isinstance(cfg_path_raw, str) else None, default_name="llm.yaml"
-                        )
-                        _require_yaml_path(cfg_path)
-                        if not cfg_path.exists():
-                            raise _JsonError("config_not_found", status=404)
-                        knowledge_path = (
-                            server._knowledge_service.resolve_path(kp_raw if isinstance(kp_raw, str) and kp_raw.strip() else None)
-                        )
+                        },
+                    )
+                    return
+                if cmd == "/show":
+                    _write_json(
+                        self,
+                        200,
+                        {
+                            "ok": True,
+                            "result": {
+                                "reply": (ks.transcript() or "") + "\n",
+                                "knowledge_appended": 0,
+                                "dry_run": bool(dry_run or ctx.dry_run),
+                            },
+                        },
+                    )
+                    return
+                if cmd in {"/spec", "/done"}:
+                    from ..core.requirement_excavation_skill import RequirementExcavationSkill
 
-                        ks = open_knowledge_store(knowledge_path)
-                        ks.load()
-
-                        if cmd in {"/exit", "/quit"}:
-                            _write_json(
-                                self,
-                                200,
-                                {
-                                    "ok": True,
-                                    "result": {"reply": "已退出。", "knowledge_appended": 0, "dry_run": bool(dry_run or server.dry_run)},
-                                },
-                            )
-                            return
-                        if cmd in {"/help", "/h"}:
-                            _write_json(
-                                self,
-                                200,
-                                {
-                                    "ok": True,
-                                    "result": {
-                                        "reply": (
-                                            "命令说明：\n"
-                                            "- /spec: 基于项目知识生成需求 YAML（不结束）\n"
-                                            "- /done: 生成需求 YAML → 生成 10 个项目名（默认选第 1 个）\n"
-                                            "- /show: 显示当前项目知识\n"
-                                            "- /reset: 清空本次页面对话记录\n"
-                                            "- /exit: 退出\n"
-                                        ),
-                                        "knowledge_appended": 0,
-                                        "dry_run": bool(dry_run or server.dry_run),
-                                    },
-                                },
-                            )
-                            return
-                        if cmd == "/reset":
-                            _write_json(
-                                self,
-                                200,
-                                {
-                                    "ok": True,
-                                    "result": {
-                                        "reply": "本轮对话记录已清空（仅影响本页面显示）。\n",
-                                        "knowledge_appended": 0,
-                                        "dry_run": bool(dry_run or server.dry_run),
-                                    },
-                                },
-                            )
-                            return
-                        if cmd == "/show":
-                            _write_json(
-                                self,
-                                200,
-                                {
-                                    "ok": True,
-                                    "result": {
-                                        "reply": (ks.transcript() or "") + "\n",
-                                        "knowledge_appended": 0,
-                                        "dry_run": bool(dry_run or server.dry_run),
-                                    },
-                                },
-                            )
-                            return
-                        if cmd in {"/spec", "/done"}:
-                            llm = get_llm(config_path=str(cfg_path), strict=True)
-                            tool = RequirementExcavationSkill(llm=llm, config_path=str(cfg_path))
-                            surface = ("项目知识（按时间顺序）：\n" + ks.transcript()) if ks.transcript() else ""
-                            spec_yaml = tool_run(tool, surface)
+                    llm = ctx._get_llm(cfg_path)
+                    tool = RequirementExcavationSkill(llm=llm, config_path=str(cfg_path))
+                    surface = ("项目知识（按时间顺序）：\n" + ks.transcript()) if ks.transcript() else ""
+                    spec_yaml = ctx._invoke_llm(tool_run, tool, surface)
+                    if persist:
+                        with ks_lock:
                             ks.latest_spec_yaml = spec_yaml
-                            if not (dry_run or server.dry_run):
-                                ks.save()
-                            reply = spec_yaml
-                            if cmd == "/done":
-                                names = generate_project_names(llm, ks.latest_spec_yaml or spec_yaml)
-                                project_name = names[0] if names else "未命名项目"
+                            ctx._save_ks(knowledge_path, ks)
+                    reply = spec_yaml
+                    if cmd == "/done":
+                        names = ctx._invoke_llm(generate_project_names, llm, spec_yaml)
+                        project_name = names[0] if names else "未命名项目"
+                        if persist:
+                            with ks_lock:
                                 ks.project_name = project_name
-                                if not (dry_run or server.dry_run):
-                                    ks.save()
-                                reply = (
-                                    spec_yaml
-                                    + "\n\n"
-                                    + "候选项目名：\n"
-                                    + "\n".join([f"{i+1}. {n}" for i, n in enumerate(names)])
-                                    + "\n\n"
-                                    + f"已选择项目名称：{project_name}\n"
-                                    + "全流程结束。可输入 /exit 退出。\n"
-                                )
-                            _write_json(
-                                self,
-                                200,
-                                {"ok": True, "result": {"reply": reply, "knowledge_appended": 0, "dry_run": bool(dry_run or server.dry_run)}},
-                            )
-                            return
-                        project_knowledge = ks.transcript()
-                        global_prompt = server.read_global_prompt()
-                        prompt = _build_web_chat_prompt(
-                            messages=messages,
-                            global_prompt=global_prompt,
-                            project_knowledge=project_knowledge,
-                            imported_context=imported,
-                        )
-
-                        llm = get_llm(config_path=str(cfg_path), strict=True)
-                        raw_reply = getattr(llm.invoke(prompt), "content", "") or ""
-                        visible, items = parse_knowledge_update(str(raw_reply))
-                        appended = 0
-                        for item in items:
-                            ks.append("system", item, autosave=False)
-                            appended += 1
-                        if appended and (not dry_run) and (not server.dry_run):
-                            ks.save()
-                        _write_json(
-                            self,
-                            200,
-                            {"ok": True, "result": {"reply": visible, "knowledge_appended": appended, "dry_run": bool(dry_run or server.dry_run)}},
+                                ctx._save_ks(knowledge_path, ks)
+                        reply = (
+                            spec_yaml
+                            + "\n\n"
+                            + "候选项目名：\n"
+                            + "\n".join([f"{i+1}. {n}" for i, n in enumerate(names)])
+                            + "\n\n"
+                            + f"已选择项目名称：{project_name}\n"
+                            + "全流程结束。可输入 /exit 退出。\n"
                         )
-                        return
-
-                    raise _JsonError("not_found", status=404)
-                except _JsonError as e:
-                    payload: dict[str, Any] = {"ok": False, "error": {"code": e.code}}
-                    if e.message:
-                        payload["error"]["message"] = e.message
-                    headers = {"WWW-Authenticate": "Bearer"} if e.status == 401 else None
-                    _write_json(self, e.status, payload, headers=headers)
-                except Exception as e:
                     _write_json(
                         self,
-                        500,
-                        {"ok": False, "error": {"code": "internal_error", "message": redact_secrets(str(e))}},
+                        200,
+                        {"ok": True, "result": {"reply": reply, "knowledge_appended": 0, "dry_run": bool(dry_run or ctx.dry_run)}},
                     )
+                    return
+                global_prompt = ctx.read_global_prompt()
+                prompt = _build_web_chat_prompt(
+                    messages=messages,
+                    global_prompt=global_prompt,
+                    project_knowledge=ctx._knowledge_tail(ks),
+                    imported_context=imported,
+                )
 
-        return Handler
+                llm = ctx._get_llm(cfg_path)
+                raw_reply = getattr(ctx._invoke_llm(llm.invoke, prompt), "content", "") or ""
+                visible, items = parse_knowledge_update(str(raw_reply))
+                if not persist:
+                    appended = sum(1 for item in items if (item or "").strip())
+                elif items:
+                    with ks_lock:
+                        appended = ks.extend("system", items, autosave=False)
+                        ctx._save_ks(knowledge_path, ks)
+                else:
+                    appended = 0
+                _write_json(
+                    self,
+                    200,
+                    {"ok": True, "result": {"reply": visible, "knowledge_appended": appended, "dry_run": bool(dry_run or ctx.dry_run)}},
+                )
+                return
 
-    def serve_forever(self) -> None:
-        with self.create_server() as httpd:
-            httpd.serve_forever()
+            raise _JsonError("not_found", status=404)
+        except _JsonError as e:
+            headers: dict[str, str] = {}
+            if e.status == 401:
+                headers["WWW-Authenticate"] = "Bearer"
+            if e.status == 503:
+                headers["Retry-After"] = "1"
+            if not body_read:
+                headers["Connection"] = "close"
+            if e.message:
+                payload = {"ok": False, "error": {"code": e.code, "message": e.message}}
+                _write_json(self, e.status, payload, headers=headers or None)
+            else:
+                _write_error(self, e.status, e.code, headers=headers or None)
+        except Exception as e:
+            _write_json(
+                self,
+                500,
+                {"ok": False, "error": {"code": "internal_error", "message": redact_secrets(str(e))}},
+                headers=None if body_read else {"Connection": "close"},
+            )
+        finally:
+            if slot:
+                self.server.release_request_slot()
 
 
-def serve_webui(*, repo_root: str | Path, bind: str = _DEFAULT_BIND, port: int = _DEFAULT_PORT, dry_run: bool = False) -> None:
-    WebUIServer(repo_root=repo_root, bind=bind, port=port, dry_run=dry_run).serve_forever()
+def serve_webui(
+    *,
+    repo_root: str | Path,
+    bind: str = _DEFAULT_BIND,
+    port: int = _DEFAULT_PORT,
+    dry_run: bool = False,
+    max_inflight_requests: int = _MAX_INFLIGHT_DEFAULT,
+    llm_concurrency: int = _LLM_CONCURRENCY_DEFAULT,
+    llm_timeout_s: float | None = None,
+) -> None:
+    WebUIServer(
+        repo_root=repo_root,
+        bind=bind,
+        port=port,
+        dry_run=dry_run,
+        max_inflight_requests=max_inflight_requests,
+        llm_concurrency=llm_concurrency,
+        llm_timeout_s=llm_timeout_s,
+    ).serve_forever()
@@ -1,4 +1,4 @@
-import { useEffect, useMemo, useRef, useState } from "react";
+import { memo, useCallback, useEffect, useMemo, useRef, useState } from "react";
 import { apiJson } from "./api";
 import { normalizeLang, t } from "./i18n";
 import type { ChatMessage, ChatWireMessage, Lang } from "./types";
@@ -57,9 +57,28 @@ function loadSessions(): { sessions: ChatSession[]; activeId: string } {
   return { sessions: [s], activeId: id };
 }
 
+const MESSAGE_WINDOW = 40;
+const SAVE_DEBOUNCE_MS = 500;
+const pendingWrites = new Map<string, () => string>();
+let saveTimer: number | null = null;
+
+function flushLocal() {
+  if (saveTimer !== null) {
+    window.clearTimeout(saveTimer);
+    saveTimer = null;
+  }
+  for (const [key, value] of pendingWrites) localStorage.setItem(key, value());
+  pendingWrites.clear();
+}
+
+function saveLocal(key: string, value: () => string) {
+  pendingWrites.set(key, value);
+  if (saveTimer === null) saveTimer = window.setTimeout(flushLocal, SAVE_DEBOUNCE_MS);
+}
+
 function saveSessions(sessions: ChatSession[], activeId: string) {
-  localStorage.setItem(SESSIONS_KEY, JSON.stringify(sessions));
-  localStorage.setItem(ACTIVE_SESSION_KEY, activeId);
+  saveLocal(SESSIONS_KEY, () => JSON.stringify(sessions));
+  saveLocal(ACTIVE_SESSION_KEY, () => activeId);
 }
 
 async function copyText(text: string) {
@@ -83,17 +102,60 @@ function prefersReducedMotion(): boolean {
   return window.matchMedia?.("(prefers-reduced-motion: reduce)")?.matches ?? false;
 }
 
+type AssistantBlock = { kind: "code" | "p"; key: string; text: string };
+
+function pushParagraphs(raw: string, start: number, end: number, seg: number, out: AssistantBlock[]) {
+  let from = start;
+  let n = 0;
+  let i = start;
+  while (i <= end) {
+    let j = i;
+    let breaks = 0;
+    while (j < end) {
+      const c = raw.charCodeAt(j);
+      if (c === 10) j += 1;
+      else if (c === 13 && j + 1 < end && raw.charCodeAt(j + 1) === 10) j += 2;
+      else break;
+      breaks++;
+    }
+    if (breaks >= 2 || i === end) {
+      let text = raw.slice(from, i);
+      if (text.includes("\r\n")) text = text.replace(/\r\n/g, "\n");
+      text = text.trim();
+      if (text) out.push({ kind: "p", key: `p-${seg}-${n++}`, text });
+      if (i === end) return;
+      from = j;
+    }
+    i = j > i ? j : i + 1;
+  }
+}
+
+function tokenizeAssistant(raw: string): AssistantBlock[] {
+  const out: AssistantBlock[] = [];
+  let pos = 0;
+  for (let seg = 0; ; seg++) {
+    const fence = raw.indexOf("```", pos);
+    const end = fence < 0 ? raw.length : fence;
+    if (seg % 2 === 1) {
+      let a = pos;
+      let b = end;
+      while (a < b && raw.charCodeAt(a) === 10) a++;
+      while (b > a && raw.charCodeAt(b - 1) === 10) b--;
+      out.push({ kind: "code", key: `code-${seg}`, text: raw.slice(a, b) });
+    } else {
+      pushParagraphs(raw, pos, end, seg, out);
+    }
+    if (fence < 0) return out;
+    pos = fence + 3;
+  }
+}
+
 function renderAssistant(lang: Lang, content: string, onCopyCode: (code: string) => void) {
-  const raw = content ?? "";
-  const chunks = raw.split("```");
-  const nodes: React.ReactNode[] = [];
-
-  for (let i = 0; i < chunks.length; i++) {
-    const text = chunks[i] ?? "";
-    if (i % 2 === 1) {
-      const code = text.replace(/^\n+|\n+$/g, "");
-      nodes.push(
-        <div key={`code-${i}`} className="mt-3 overflow-hidden rounded-2xl border border-[#2a2b2e] bg-[#1e1f20]">
+  const nodes = tokenizeAssistant(content ?? "").map((b) => {
+    if (b.kind === "code") {
+      const code = b.text;
+      return (
+        <div key={b.key} className="mt-3 overflow-hidden rounded-2xl border border-[#2a2b2e] bg-[#1e1f20]">
           <div className="flex items-center justify-between gap-2 border-b border-[#2a2b2e] px-4 py-2">
             <div className="text-[12px] text-[#c4c7c5]">{t(lang, "code_block")}</div>
             <button
@@ -109,25 +171,29 @@ function renderAssistant(lang: Lang, content: string, onCopyCode: (code: string)
           </pre>
         </div>
       );
-      continue;
     }
-    const paras = text
-      .replace(/\r\n/g, "\n")
-      .split(/\n{2,}/g)
-      .map((p) => p.trim())
-      .filter(Boolean);
-    for (let j = 0; j < paras.length; j++) {
-      nodes.push(
-        <p key={`p-${i}-${j}`} className="whitespace-pre-wrap text-[15px] leading-7 text-[#e3e3e3]">
-          {paras[j]}
-        </p>
-      );
-    }
-  }
+    return (
+      <p key={b.key} className="whitespace-pre-wrap text-[15px] leading-7 text-[#e3e3e3]">
+        {b.text}
+      </p>
+    );
+  });
 
   return <div className="space-y-3">{nodes}</div>;
 }
 
+const AssistantContent = memo(function AssistantContent({
+  lang,
+  content,
+  onCopyCode,
+}: {
+  lang: Lang;
+  content: string;
+  onCopyCode: (code: string) => void;
+}) {
+  return renderAssistant(lang, content, onCopyCode);
+});
+
 export function App() {
   const [view, setView] = useState<View>("chat");
   const [lang, setLang] = useState<Lang>(() => normalizeLang(localStorage.getItem("reqx_lang") || "zh-CN"));
@@ -151,25 +217,26 @@ export function App() {
   const [showJump, setShowJump] = useState<boolean>(false);
   const [editingId, setEditingId] = useState<string | null>(null);
   const [editDraft, setEditDraft] = useState<string>("");
+  const [windowSize, setWindowSize] = useState<number>(MESSAGE_WINDOW);
 
   const listRef = useRef<HTMLDivElement | null>(null);
   const inputRef = useRef<HTMLTextAreaElement | null>(null);
   const animateAbortRef = useRef<{ aborted: boolean } | null>(null);
 
   useEffect(() => {
-    localStorage.setItem("reqx_lang", lang);
+    saveLocal("reqx_lang", () => lang);
   }, [lang]);
   useEffect(() => {
-    localStorage.setItem("reqx_authToken", authToken);
+    saveLocal("reqx_authToken", () => authToken);
   }, [authToken]);
   useEffect(() => {
-    localStorage.setItem("reqx_cfgPath", cfgPath);
+    saveLocal("reqx_cfgPath", () => cfgPath);
   }, [cfgPath]);
   useEffect(() => {
-    localStorage.setItem("reqx_knowledgePath", knowledgePath);
+    saveLocal("reqx_knowledgePath", () => knowledgePath);
   }, [knowledgePath]);
   useEffect(() => {
-    localStorage.setItem("reqx_dryRun", dryRun ? "1" : "");
+    saveLocal("reqx_dryRun", () => dryRun ? "1" : "");
   }, [dryRun]);
 
   useEffect(() => {
@@ -193,6 +260,18 @@ export function App() {
     saveSessions(sessions, activeId);
   }, [sessions, activeId]);
 
+  useEffect(() => {
+    const onHide = () => {
+      if (document.visibilityState === "hidden") flushLocal();
+    };
+    window.addEventListener("pagehide", flushLocal);
+    document.addEventListener("visibilitychange", onHide);
+    return () => {
+      window.removeEventListener("pagehide", flushLocal);
+      document.removeEventListener("visibilitychange", onHide);
+    };
+  }, []);
+
   const navItems = useMemo(
     () =>
       [
@@ -206,6 +285,12 @@ export function App() {
 
   const activeSession = useMemo(() => sessions.find((s) => s.id === activeId) || sessions[0], [sessions, activeId]);
   const messages = activeSession?.messages || [];
+  const hiddenCount = Math.max(0, messages.length - windowSize);
+  const shownMessages = hiddenCount ? messages.slice(hiddenCount) : messages;
+
+  useEffect(() => {
+    setWindowSize(MESSAGE_WINDOW);
+  }, [activeId]);
 
   function pushToast(text: string, kind: Toast["kind"] = "info") {
     const id = makeId();
@@ -213,6 +298,18 @@ export function App() {
     window.setTimeout(() => setToasts((prev) => prev.filter((t) => t.id !== id)), 2600);
   }
 
+  const copyCode = useCallback(
+    async (code: string) => {
+      try {
+        await copyText(code);
+        pushToast(t(lang, "copied"));
+      } catch {
+        pushToast(t(lang, "copy_failed"), "error");
+      }
+    },
+    [lang]
+  );
+
   function updateActiveMessages(updater: (prev: ChatMessage[]) => ChatMessage[]) {
     setSessionState((prev) => {
       const nextSessions = prev.sessions.map((s) => {
@@ -695,7 +792,19 @@ export function App() {
                   </div>
                 )}
 
-                {messages.map((m, idx) => (
+                {hiddenCount > 0 && (
+                  <div className="flex justify-center">
+                    <button
+                      type="button"
+                      onClick={() => setWindowSize((n) => n + MESSAGE_WINDOW)}
+                      className="rounded-full bg-[#1e1f20] px-4 py-2 text-[12px] text-[#c4c7c5] hover:bg-[#2d2e31] hover:text-[#e3e3e3]"
+                    >
+                      {t(lang, "show_earlier")} ({hiddenCount})
+                    </button>
+                  </div>
+                )}
+
+                {shownMessages.map((m, idx) => (
                   <div
                     key={m.id}
                     className={cn("reqx-animate-slide-up group flex gap-4", m.role === "user" ? "flex-row-reverse" : "")}
@@ -772,14 +881,7 @@ export function App() {
                         <div className="min-w-0">
                           <div className="flex items-start justify-between gap-3">
                             <div className="min-w-0 flex-1">
-                              {renderAssistant(lang, m.content, async (code) => {
-                                try {
-                                  await copyText(code);
-                                  pushToast(t(lang, "copied"));
-                                } catch {
-                                  pushToast(t(lang, "copy_failed"), "error");
-                                }
-                              })}
+                              <AssistantContent lang={lang} content={m.content} onCopyCode={copyCode} />
                             </div>
                             <div className="mt-1 flex flex-none items-center gap-1">
                               <button
@@ -854,7 +956,7 @@ export function App() {
                                   <path d="M18 13V4" stroke="currentColor" strokeWidth="1.6" />
                                 </svg>
                               </button>
-                              {idx === messages.length - 1 && messages[messages.length - 1]?.role === "assistant" && (
+                              {idx === shownMessages.length - 1 && m.role === "assistant" && (
                                 <button
                                   type="button"
                                   onClick={() => {
@@ -41,6 +41,7 @@ const ZH: Dict = {
   edit: "编辑",
   cancel: "取消",
   save_and_run: "保存并重新生成",
+  show_earlier: "显示更早的消息",
 
   copy: "复制",
   copied: "已复制",
@@ -106,6 +107,7 @@ const EN: Dict = {
   edit: "Edit",
   cancel: "Cancel",
   save_and_run: "Save & Regenerate",
+  show_earlier: "Show earlier messages",
 
   copy: "Copy",
   copied: "Copied",
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import json
+import os
 from pathlib import Path
 import shutil
 import sys
@@ -19,34 +21,45 @@ def _rm(path: Path) -> None:
             return
 
 
+_TARGET_NAMES = frozenset({"__pycache__", ".pytest_cache", ".ruff_cache", ".mypy_cache", ".coverage", "build", "dist"})
+_TARGET_SUFFIXES = (".egg-info", ".pyc", ".pyo")
+_SKIP_DIRS = frozenset({".venv", "venv", ".tox", ".git"})
+_RM_WORKERS = 8
+
+
 def _collect_targets(repo_root: Path) -> list[Path]:
-    patterns = [
-        "__pycache__",
-        ".pytest_cache",
-        ".ruff_cache",
-        ".mypy_cache",
-        ".coverage",
-        "build",
-        "dist",
-        "*.egg-info",
-        "*.pyc",
-        "*.pyo",
-    ]
     targets: list[Path] = []
-    for pat in patterns:
-        for p in repo_root.rglob(pat):
-            parts = {x.lower() for x in p.parts}
-            if any(x in parts for x in {".venv", "venv", ".tox"}):
-                continue
-            targets.append(p)
-    return sorted(set(targets))
+    stack = [str(repo_root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                name = entry.name
+                if name in _TARGET_NAMES or name.endswith(_TARGET_SUFFIXES):
+                    targets.append(Path(entry.path))
+                    continue
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir and name.lower() not in _SKIP_DIRS:
+                    stack.append(entry.path)
+    return sorted(targets)
 
 
 def clean(repo_root: Path) -> dict:
-    removed: list[str] = []
-    for p in _collect_targets(repo_root):
-        _rm(p)
-        removed.append(str(p))
+    targets = _collect_targets(repo_root)
+    if len(targets) > 1:
+        # Targets never nest (the walk stops at a match), so removals are independent.
+        with ThreadPoolExecutor(max_workers=min(_RM_WORKERS, len(targets))) as pool:
+            list(pool.map(_rm, targets))
+    else:
+        for p in targets:
+            _rm(p)
+    removed = [str(p) for p in targets]
     return {"removed_count": len(removed), "removed": removed}
 
 
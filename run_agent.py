@@ -7,11 +7,8 @@ import time
 from contextlib import contextmanager
 import shutil
 
-from crewai import Agent, Crew, LLM, Task
-import httpx
 
-from agents import RequirementExcavationSkill, get_llm
-from agents.core.llm_factory import load_llm_config, redact_secrets
+_HEARTBEAT_MAX_INTERVAL_S = 30.0
 
 
 def _timeout_seconds() -> float:
@@ -44,24 +41,32 @@ def _resolve_env_path(*, env_file: str, config_dir: Path) -> Path:
     return config_dir / env_file
 
 
-def _heartbeat(label: str, *, interval_s: float = 5.0) -> threading.Event:
+def _stderr_is_tty() -> bool:
+    return bool(getattr(sys.stderr, "isatty", lambda: False)())
+
+
+def _heartbeat(label: str, *, interval_s: float = 5.0, is_tty: bool | None = None) -> threading.Event:
     stop = threading.Event()
     started = time.monotonic()
+    tty = _stderr_is_tty() if is_tty is None else is_tty
 
     def _run() -> None:
-        is_tty = bool(getattr(sys.stderr, "isatty", lambda: False)())
+        write = sys.stderr.write
+        flush = sys.stderr.flush
+        monotonic = time.monotonic
         last_len = 0
-        while not stop.wait(interval_s):
-            elapsed = int(time.monotonic() - started)
+        wait_s = interval_s
+        while not stop.wait(wait_s):
+            elapsed = int(monotonic() - started)
             msg = f"[{elapsed:>4}s] {label}"
-            if is_tty:
+            if tty:
                 padding = max(0, last_len - len(msg))
-                sys.stderr.write("\r" + msg + (" " * padding))
-                sys.stderr.flush()
+                write("\r" + msg + (" " * padding))
                 last_len = len(msg)
             else:
-                sys.stderr.write(msg + "\n")
-                sys.stderr.flush()
+                write(msg + "\n")
+                wait_s = min(wait_s * 2, max(interval_s, _HEARTBEAT_MAX_INTERVAL_S))
+            flush()
 
     t = threading.Thread(target=_run, name="run_agent_heartbeat", daemon=True)
     t.start()
@@ -72,17 +77,17 @@ def _heartbeat(label: str, *, interval_s: float = 5.0) -> threading.Event:
 def _step(title: str, *, heartbeat: str | None = None):
     print(title, flush=True)
     stop: threading.Event | None = None
-    heartbeat_active = False
+    is_tty = False
     if heartbeat:
-        stop = _heartbeat(heartbeat)
-        heartbeat_active = True
+        is_tty = _stderr_is_tty()
+        stop = _heartbeat(heartbeat, is_tty=is_tty)
     try:
         yield
         print(f"{title} 完成。", flush=True)
     finally:
         if stop:
             stop.set()
-            if heartbeat_active and bool(getattr(sys.stderr, "isatty", lambda: False)()):
+            if is_tty:
                 width = int(getattr(shutil.get_terminal_size(fallback=(120, 24)), "columns", 120))
                 sys.stderr.write("\r" + (" " * max(20, width)) + "\r")
                 sys.stderr.flush()
@@ -123,6 +128,10 @@ def _build_parser() -> argparse.ArgumentParser:
 
 def main(argv: list[str] | None = None) -> None:
     args = _build_parser().parse_args(argv)
+
+    from agents import RequirementExcavationSkill, get_llm
+    from agents.core.llm_factory import get_shared_http_client, load_llm_config, redact_secrets
+
     with _step("加载 LLM 配置"):
         cfg = load_llm_config(args.config, strict=True)
 
@@ -142,7 +151,7 @@ def main(argv: list[str] | None = None) -> None:
 
     with _step("初始化 LLM 客户端"):
         max_tokens = _resolve_max_tokens(cfg.max_tokens, args.max_tokens)
-        lc_llm = get_llm(config_path=str(resolved_config_path), strict=True, max_tokens=max_tokens)
+        lc_llm = get_llm(cfg=cfg, max_tokens=max_tokens)
         tool = RequirementExcavationSkill(llm=lc_llm, config_path=str(resolved_config_path))
 
     if not args.no_openai_key_map:
@@ -153,6 +162,8 @@ def main(argv: list[str] | None = None) -> None:
     if not args.skip_connectivity_test:
         try:
             with _step("进行 LLM 连通性测试（GET /models）", heartbeat="等待 LLM 连通性测试返回（网络/代理/DNS 可能较慢）"):
+                import httpx
+
                 base_url = (cfg.base_url or "").strip()
                 if not base_url:
                     raise RuntimeError("当前配置未设置 base_url，无法进行 /models 测试")
@@ -160,7 +171,7 @@ def main(argv: list[str] | None = None) -> None:
                 timeout_s = float(args.connectivity_timeout_s) if args.connectivity_timeout_s and args.connectivity_timeout_s > 0 else 20.0
                 timeout_s = min(timeout_s, _timeout_seconds())
                 url = base_url.rstrip("/") + "/models"
-                r = httpx.get(
+                r = get_shared_http_client().get(
                     url,
                     headers={"Authorization": "Bearer " + (os.getenv("OPENAI_API_KEY") or "")},
                     timeout=httpx.Timeout(timeout_s, connect=min(10.0, timeout_s)),
@@ -199,6 +210,8 @@ def main(argv: list[str] | None = None) -> None:
             print(_tool_run(tool, surface), flush=True)
         return
 
+    from crewai import Agent, Crew, LLM, Task
+
     with _step("构建 CrewAI LLM"):
         timeout_s = _timeout_seconds()
         crewai_llm = LLM(
@@ -23,3 +23,19 @@ class TestEntrypoints(unittest.TestCase):
             self.assertEqual(code, 0)
             popen.assert_called_once()
             check_call.assert_not_called()
+
+    def test_install_main_execs_pip_on_posix(self) -> None:
+        from agents.cli.admin import install_main
+
+        with (
+            mock.patch("agents.cli.admin.os.name", "posix"),
+            mock.patch("agents.cli.admin.os.execv", side_effect=SystemExit(0)) as execv,
+            mock.patch("agents.cli.admin.subprocess.check_call") as check_call,
+        ):
+            with self.assertRaises(SystemExit):
+                install_main(no_deps=True)
+            execv.assert_called_once()
+            _path, argv = execv.call_args.args
+            self.assertEqual(argv[1:5], ["-m", "pip", "install", "-e"])
+            self.assertEqual(argv[-1], "--no-deps")
+            check_call.assert_not_called()
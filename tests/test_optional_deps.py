@@ -23,3 +23,65 @@ class TestOptionalDeps(unittest.TestCase):
             self.assertTrue(hasattr(m, "parse_knowledge_payload_wire"))
             self.assertTrue(hasattr(m, "parse_transcript_payload_wire"))
 
+    def test_web_server_json_falls_back_without_orjson(self) -> None:
+        import agents.web
+
+        original = sys.modules.pop("agents.web.server", None)
+
+        original_import = __import__
+
+        def blocked_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if name == "orjson":
+                raise ModuleNotFoundError("No module named 'orjson'")
+            return original_import(name, globals, locals, fromlist, level)
+
+        with mock.patch("builtins.__import__", side_effect=blocked_import):
+            m = importlib.import_module("agents.web.server")
+        sys.modules.pop("agents.web.server", None)
+        if original is None:
+            original = importlib.import_module("agents.web.server")
+        sys.modules["agents.web.server"] = original
+        agents.web.server = original
+        self.assertIsNone(m.orjson)
+        self.assertEqual(m._dumps_json({"ok": True, "msg": "你好"}), '{"ok":true,"msg":"你好"}'.encode("utf-8"))
+        self.assertEqual(m._loads_json('{"msg":"你好"}'.encode("utf-8")), {"msg": "你好"})
+
+    def test_yaml_io_falls_back_without_libyaml(self) -> None:
+        sys.modules.pop("agents.core.yaml_io", None)
+
+        original_import = __import__
+
+        def blocked_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if name == "yaml" and fromlist and "CSafeLoader" in fromlist:
+                raise ImportError("cannot import name 'CSafeLoader' from 'yaml'")
+            return original_import(name, globals, locals, fromlist, level)
+
+        with mock.patch("builtins.__import__", side_effect=blocked_import):
+            m = importlib.import_module("agents.core.yaml_io")
+        sys.modules.pop("agents.core.yaml_io", None)
+        importlib.import_module("agents.core.yaml_io")
+        self.assertEqual(m._Loader.__name__, "SafeLoader")
+        text = m.safe_dump({"b": "你好", "a": [1, 2]})
+        self.assertEqual(text, "b: 你好\na:\n- 1\n- 2\n")
+        self.assertEqual(m.safe_load(text), {"b": "你好", "a": [1, 2]})
+
+    def test_llm_factory_imports_without_httpx(self) -> None:
+        import agents.core
+
+        original = sys.modules.pop("agents.core.llm_factory", None)
+
+        original_import = __import__
+
+        def blocked_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if name == "httpx":
+                raise ModuleNotFoundError("No module named 'httpx'")
+            return original_import(name, globals, locals, fromlist, level)
+
+        with mock.patch("builtins.__import__", side_effect=blocked_import):
+            m = importlib.import_module("agents.core.llm_factory")
+        sys.modules.pop("agents.core.llm_factory", None)
+        if original is None:
+            original = importlib.import_module("agents.core.llm_factory")
+        sys.modules["agents.core.llm_factory"] = original
+        agents.core.llm_factory = original
+        self.assertEqual(m.load_llm_config("this_file_should_not_exist_llm.yaml", strict=False).provider, "openai")
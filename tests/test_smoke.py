@@ -1,6 +1,8 @@
+from pathlib import Path
+import tempfile
 import unittest
 
-from agents.core.llm_factory import load_llm_config, redact_secrets
+from agents.core.llm_factory import load_llm_config, redact_secrets, redact_secrets_ex
 
 
 class TestSmoke(unittest.TestCase):
@@ -10,10 +12,73 @@ class TestSmoke(unittest.TestCase):
         self.assertNotIn("sk-1234567890abcdef", redacted)
         self.assertIn("<redacted>", redacted)
 
+    def test_redact_secrets_prefilter(self) -> None:
+        plain = "provider: openai\nmodel: gpt-4o-mini\n"
+        self.assertEqual(redact_secrets(plain), plain)
+        self.assertNotIn("ghp_abcdefghijklmnop", redact_secrets("see ghp_abcdefghijklmnop here"))
+        self.assertNotIn("AIzaSyA1234567890abcdefghij", redact_secrets("AIzaSyA1234567890abcdefghij"))
+
+    def test_redact_secrets_ex_reports_changes(self) -> None:
+        self.assertEqual(redact_secrets_ex("model: gpt-4o-mini"), ("model: gpt-4o-mini", False))
+        self.assertEqual(redact_secrets_ex("token=<redacted>"), ("token=<redacted>", False))
+        out, changed = redact_secrets_ex("OPENAI_API_KEY=abc123")
+        self.assertTrue(changed)
+        self.assertEqual(out, redact_secrets("OPENAI_API_KEY=abc123"))
+
     def test_missing_config_non_strict(self) -> None:
         cfg = load_llm_config("this_file_should_not_exist_llm.yaml", strict=False)
         self.assertTrue(cfg.warnings)
 
+    def test_load_llm_config_cache_tracks_size(self) -> None:
+        import os
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg_path = Path(tmp) / "llm.yaml"
+            cfg_path.write_text("provider: openai\nmodel: gpt-4o\n", encoding="utf-8")
+            first = load_llm_config(cfg_path, strict=True)
+            self.assertIs(load_llm_config(cfg_path, strict=True), first)
+            st = cfg_path.stat()
+            cfg_path.write_text("provider: openai\nmodel: gpt-4o-mini\n", encoding="utf-8")
+            os.utime(cfg_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+            self.assertEqual(load_llm_config(cfg_path, strict=True).model, "gpt-4o-mini")
+
+    def test_knowledge_extend_persists_batch(self) -> None:
+        from agents.storage.knowledge_store import open_knowledge_store
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ["k.yaml", "k.db"]:
+                ks = open_knowledge_store(Path(tmp) / name)
+                ks.load()
+                self.assertEqual(ks.extend("system", ["a", " ", "b "]), 2)
+                ks.extend("system", ["c"], autosave=False)
+                ks.save()
+                again = open_knowledge_store(Path(tmp) / name)
+                again.load()
+                self.assertEqual([r.content for r in again.records], ["a", "b", "c"])
+
+    def test_write_env_kv_updates_in_one_pass(self) -> None:
+        from agents.cli.admin import _write_env_kv
+
+        with tempfile.TemporaryDirectory() as tmp:
+            env_path = Path(tmp) / "sub" / ".env"
+            self.assertTrue(_write_env_kv(env_path, {"A": "1"}))
+            env_path.write_text("# note\nA=1\nB = old\n", encoding="utf-8")
+            self.assertTrue(_write_env_kv(env_path, {"B": "2", "C": "3"}))
+            self.assertEqual(env_path.read_text(encoding="utf-8"), "# note\nA=1\nB=2\n\nC=3\n")
+            self.assertFalse(_write_env_kv(env_path, {"A": "1", "C": "3"}))
+
+    def test_clean_collects_targets_in_one_walk(self) -> None:
+        from clean_repo import _collect_targets
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            for rel in ["a/__pycache__/x.pyc", "b/c.pyc", "pkg.egg-info/PKG", "venv/lib/__pycache__/y.pyc", ".git/refs/heads/build", "src/app.py"]:
+                p = root / rel
+                p.parent.mkdir(parents=True, exist_ok=True)
+                p.write_text("x", encoding="utf-8")
+            found = [p.relative_to(root).as_posix() for p in _collect_targets(root)]
+        self.assertEqual(found, ["a/__pycache__", "b/c.pyc", "pkg.egg-info"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,535 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+import gzip
+import http.client
+import json
+import os
+from pathlib import Path
+import socket
+import tempfile
+import threading
+import time
+import unittest
+import urllib.request
+from typing import Any, Iterator
+from unittest import mock
+import urllib.error
+
+
+@contextmanager
+def _running(srv: Any) -> Iterator[str]:
+    httpd = srv.create_server()
+    t = threading.Thread(target=httpd.serve_forever, daemon=True)
+    t.start()
+    try:
+        yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def _post(url: str, payload: dict[str, Any], *, token: str | None = None) -> tuple[int, dict[str, Any]]:
+    headers = {"Content-Type": "application/json"}
+    if token is not None:
+        headers["Authorization"] = f"Bearer {token}"
+    req = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"), headers=headers, method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=5) as r:
+            return r.status, json.loads(r.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read().decode("utf-8"))
+
+
+class TestWebUIServer(unittest.TestCase):
+    def test_load_cfg_is_cached_until_file_changes(self) -> None:
+        from agents.web import server as web_server
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            cfg_path = root / "llm.yaml"
+            cfg_path.write_text("provider: openai\nmodel: gpt-4o-mini\n", encoding="utf-8")
+            srv = web_server.WebUIServer(repo_root=root, token_env=None)
+            with mock.patch.object(web_server, "load_llm_config", wraps=web_server.load_llm_config) as loader:
+                _cfg, first = srv._load_cfg(cfg_path)
+                _cfg, second = srv._load_cfg(cfg_path)
+                self.assertIs(first, second)
+                self.assertEqual(loader.call_count, 1)
+
+                cfg_path.write_text("provider: openai\nmodel: gpt-4o\n", encoding="utf-8")
+                st = cfg_path.stat()
+                os.utime(cfg_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+                _cfg, third = srv._load_cfg(cfg_path)
+                self.assertEqual(third["model"], "gpt-4o")
+                self.assertEqual(loader.call_count, 2)
+
+    def test_redacted_prompt_is_cached_until_file_changes(self) -> None:
+        from agents.web import server as web_server
+
+        with tempfile.TemporaryDirectory() as tmp:
+            srv = web_server.WebUIServer(repo_root=tmp, token_env=None)
+            srv._prompt_path.parent.mkdir(parents=True, exist_ok=True)
+            srv._prompt_path.write_text("api_key: sk-abcdefghijklmnopqrstuvwxyz\n", encoding="utf-8")
+            with mock.patch.object(web_server, "redact_secrets_ex", wraps=web_server.redact_secrets_ex) as redact:
+                first = srv.read_global_prompt_redacted()
+                second = srv.read_global_prompt_redacted()
+                self.assertIs(first, second)
+                self.assertEqual(redact.call_count, 1)
+                self.assertTrue(first[1])
+                self.assertNotIn("sk-abcdefghijklmnopqrstuvwxyz", first[0])
+
+                srv._prompt_path.write_text("plain prompt\n", encoding="utf-8")
+                st = srv._prompt_path.stat()
+                os.utime(srv._prompt_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+                self.assertEqual(srv.read_global_prompt_redacted(), ("plain prompt", False))
+
+    def test_knowledge_tail_is_cached_until_store_changes(self) -> None:
+        from agents.storage.knowledge_store import KnowledgeStore
+        from agents.web import server as web_server
+
+        with tempfile.TemporaryDirectory() as tmp:
+            srv = web_server.WebUIServer(repo_root=tmp, token_env=None)
+            ks = KnowledgeStore(Path(tmp) / "k.yaml")
+            ks.append("user", "first", autosave=False)
+            first = srv._knowledge_tail(ks)
+            self.assertIs(srv._knowledge_tail(ks), first)
+            self.assertEqual(first, web_server._tail_lines(ks.iter_transcript(), 4000))
+
+            ks.append("assistant", "second", autosave=False)
+            second = srv._knowledge_tail(ks)
+            self.assertIn("second", second)
+            ks.records = []
+            self.assertEqual(srv._knowledge_tail(ks), "")
+
+    def test_resolve_under_rejects_escapes(self) -> None:
+        from agents.web.server import _JsonError, _resolve_under
+
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp).resolve()
+            self.assertEqual(_resolve_under(base, "sub/../llm.yaml", default_name="x"), base / "llm.yaml")
+            self.assertEqual(_resolve_under(base, None, default_name="llm.yaml"), base / "llm.yaml")
+            escapes = ["../llm.yaml", str(base) + "-other/llm.yaml"]
+            if hasattr(os, "symlink"):
+                outside = tempfile.mkdtemp()
+                self.addCleanup(os.rmdir, outside)
+                os.symlink(outside, base / "link")
+                escapes.append("link/llm.yaml")
+            for raw in escapes:
+                with self.assertRaises(_JsonError):
+                    _resolve_under(base, raw, default_name="llm.yaml")
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "symlinks unavailable")
+    def test_config_path_recheck_after_symlink_swap(self) -> None:
+        from agents.web.server import _JsonError, _resolve_config_path
+
+        with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as outside:
+            base = Path(tmp).resolve()
+            (base / "cfg").mkdir()
+            self.assertEqual(_resolve_config_path(base, "cfg/llm.yaml"), base / "cfg" / "llm.yaml")
+            (base / "cfg").rmdir()
+            os.symlink(outside, base / "cfg")
+            with self.assertRaises(_JsonError):
+                _resolve_config_path(base, "cfg/llm.yaml")
+
+    def test_threaded_server_serves_health(self) -> None:
+        from agents.web.server import WebUIServer
+
+        with tempfile.TemporaryDirectory() as tmp:
+            srv = WebUIServer(repo_root=tmp, port=0, token_env=None, max_inflight_requests=2)
+            with _running(srv) as base:
+                for _ in range(4):
+                    with urllib.request.urlopen(f"{base}/health", timeout=5) as r:
+                        self.assertEqual(r.status, 200)
+                        self.assertEqual(r.read(), b'{"ok":true}')
+
+    def test_idle_keepalive_connections_do_not_starve_workers(self) -> None:
+        from agents.web.server import WebUIServer
+
+        with tempfile.TemporaryDirectory() as tmp:
+            srv = WebUIServer(repo_root=tmp, port=0, token_env=None, max_inflight_requests=2)
+            with _running(srv) as base:
+                port = int(base.rsplit(":", 1)[1])
+                idle = [socket.create_connection(("127.0.0.1", port), timeout=5) for _ in range(2)]
+                try:
+                    for s in idle:
+                        s.sendall(b"GET /health HTTP/1.1\r\nHost: x\r\n\r\n")
+                        self.assertIn(b"200", s.recv(4096))
+                    with urllib.request.urlopen(f"{base}/health", timeout=3) as r:
+                        self.assertEqual(r.status, 200)
+                finally:
+                    for s in idle:
+                        s.close()
+
+    def test_server_close_does_not_wait_for_open_connections(self) -> None:
+        from agents.web.server import WebUIServer
+
+        with tempfile.TemporaryDirectory() as tmp:
+            srv = WebUIServer(repo_root=tmp, port=0, token_env=None, max_inflight_requests=2)
+            httpd = srv.create_server()
+            t = threading.Thread(target=httpd.serve_forever, daemon=True)
+            t.start()
+            conn = socket.create_connection(("127.0.0.1", httpd.server_address[1]), timeout=5)
+            try:
+                conn.sendall(b"GET /health HTTP/1.1\r\nHost: x\r\n\r\n")
+                self.assertIn(b"200", conn.recv(4096))
+                started = time.monotonic()
+                httpd.shutdown()
+                httpd.server_close()
+                self.assertLess(time.monotonic() - started, 2.0)
+            finally:
+                conn.close()
+
+    def test_write_paths_require_matching_token(self) -> None:
+        from agents.web.server import WebUIServer
+
+        with tempfile.TemporaryDirectory() as tmp:
+            srv = WebUIServer(repo_root=tmp, port=0, token_value="s3cret")
+            with _running(srv) as base:
+                url = f"{base}/v1/prompt/write"
+                payload = {"content": "hello", "dry_run": True}
+                self.assertEqual(_post(url, payload)[0], 401)
+                self.assertEqual(_post(url, payload, token="wrong")[0], 401)
+                status, body = _post(url, payload, token="s3cret")
+                self.assertEqual(status, 200)
+                self.assertTrue(body["result"]["dry_run"])
+
+    def test_index_gzip_matches_plain_and_carries_nonce(self) -> None:
+        from agents.web.server import WebUIServer
+
+        with tempfile.TemporaryDirectory() as tmp:
+            srv = WebUIServer(repo_root=tmp, port=0, token_env=None)
+            with _running(srv) as base:
+                req = urllib.request.Request(f"{base}/", headers={"Accept-Encoding": "gzip"})
+                with urllib.request.urlopen(req, timeout=5) as r:
+                    self.assertEqual(r.headers.get("Content-Encoding"), "gzip")
+                    csp = r.headers.get("Content-Security-Policy") or ""
+                    html = gzip.decompress(r.read()).decode("utf-8")
+                nonce = csp.split("'nonce-", 1)[1].split("'", 1)[0]
+                self.assertIn(f'nonce="{nonce}"', html)
+                with urllib.request.urlopen(f"{base}/", timeout=5) as r:
+                    self.assertIsNone(r.headers.get("Content-Encoding"))
+                    self.assertIn("<html", r.read().decode("utf-8").lower())
+                req = urllib.request.Request(f"{base}/", headers={"Accept-Encoding": "gzip;q=0, identity"})
+                with urllib.request.urlopen(req, timeout=5) as r:
+                    self.assertIsNone(r.headers.get("Content-Encoding"))
+
+    def test_accepts_gzip_honours_q_values(self) -> None:
+        from agents.web.server import _accepts_gzip
+
+        self.assertTrue(_accepts_gzip("gzip, deflate, br"))
+        self.assertTrue(_accepts_gzip("br;q=1.0, gzip;q=0.8"))
+        self.assertTrue(_accepts_gzip("*"))
+        self.assertFalse(_accepts_gzip(None))
+        self.assertFalse(_accepts_gzip("gzip;q=0"))
+        self.assertFalse(_accepts_gzip("GZIP; q=0.000, identity"))
+        self.assertFalse(_accepts_gzip("*;q=0.5, gzip;q=0"))
+        self.assertFalse(_accepts_gzip("gzip;q=abc"))
+        self.assertFalse(_accepts_gzip("deflate"))
+
+    def test_webui_page_render_injects_nonce(self) -> None:
+        from agents.web.server import _WebUIPage
+
+        page = _WebUIPage('<html><style>b{}</style><script type="module">c()</script></html>')
+        plain = page.render("n1").decode("utf-8")
+        self.assertEqual(plain, '<html><style nonce="n1">b{}</style><script nonce="n1" type="module">c()</script></html>')
+        self.assertEqual(gzip.decompress(page.render("n1", gzip=True)).decode("utf-8"), plain)
+        kept = _WebUIPage('<script nonce="x">a()</script>').render("n2").decode("utf-8")
+        self.assertEqual(kept, '<script nonce="x">a()</script>')
+
+    def test_recent_knowledge_reads_are_pruned(self) -> None:
+        from agents.web import server as web_server
+
+        with tempfile.TemporaryDirectory() as tmp:
+            srv = web_server.WebUIServer(repo_root=tmp, token_env=None)
+            with mock.patch.object(web_server, "_KNOWLEDGE_READ_TTL_S", 0.0):
+                for i in range(20):
+                    srv._read_knowledge(f"k{i}.yaml")
+            self.assertEqual(len(srv._knowledge_recent), 1)
+
+    def test_concurrent_knowledge_reads_are_coalesced(self) -> None:
+        from agents.service.knowledge_service import KnowledgeSnapshot
+        from agents.web.server import WebUIServer
+
+        calls: list[Path] = []
+        gate = threading.Event()
+
+        def slow_read(path: Path) -> KnowledgeSnapshot:
+            calls.append(path)
+            gate.wait(5)
+            return KnowledgeSnapshot(schema_version=1, project_name=None, latest_spec_yaml=None, records=[])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            srv = WebUIServer(repo_root=tmp, token_env=None)
+            results: list[dict[str, Any]] = []
+            with mock.patch.object(srv._knowledge_service, "read", side_effect=slow_read):
+                threads = [threading.Thread(target=lambda: results.append(srv._read_knowledge(None))) for _ in range(5)]
+                for t in threads:
+                    t.start()
+                gate.set()
+                for t in threads:
+                    t.join(5)
+            self.assertEqual(len(calls), 1)
+            self.assertEqual(len(results), 5)
+            self.assertEqual(results[0]["records"], [])
+
+    def test_large_knowledge_read_is_streamed(self) -> None:
+        from agents.service.knowledge_service import KnowledgeSnapshot
+        from agents.web.server import WebUIServer
+
+        records = [{"role": "user", "content": f"条目 {i}"} for i in range(300)]
+        snap = KnowledgeSnapshot(schema_version=1, project_name="demo", latest_spec_yaml=None, records=records)
+        with tempfile.TemporaryDirectory() as tmp:
+            srv = WebUIServer(repo_root=tmp, port=0, token_env=None)
+            with mock.patch.object(srv._knowledge_service, "read", return_value=snap), _running(srv) as base:
+                host, port = base.rsplit("/", 1)[-1].split(":")
+                conn = http.client.HTTPConnection(host, int(port), timeout=5)
+                try:
+                    conn.request("POST", "/v1/knowledge/read", body=b"{}", headers={"Content-Type": "application/json"})
+                    resp = conn.getresponse()
+                    self.assertEqual(resp.getheader("Transfer-Encoding"), "chunked")
+                    payload = json.loads(resp.read().decode("utf-8"))
+                finally:
+                    conn.close()
+                with socket.create_connection((host, int(port)), timeout=5) as s:
+                    s.sendall(b"POST /v1/knowledge/read HTTP/1.0\r\nContent-Length: 2\r\n\r\n{}")
+                    raw = b""
+                    while chunk := s.recv(65536):
+                        raw += chunk
+        head, _, body = raw.partition(b"\r\n\r\n")
+        self.assertNotIn(b"transfer-encoding", head.lower())
+        self.assertEqual(json.loads(body.decode("utf-8"))["result"]["records"], records)
+        self.assertTrue(payload["ok"])
+        self.assertEqual(payload["result"]["project_name"], "demo")
+        self.assertEqual(payload["result"]["records"], records)
+
+    def test_chat_send_appends_knowledge_and_reuses_store(self) -> None:
+        from agents.web import server as web_server
+
+        class _Reply:
+            content = 'ok\n<KNOWLEDGE>{"append":["fact one"]}</KNOWLEDGE>'
+
+        class _Llm:
+            def invoke(self, prompt: str) -> _Reply:
+                return _Reply()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "llm.yaml").write_text("provider: openai\n", encoding="utf-8")
+            srv = web_server.WebUIServer(repo_root=root, port=0, token_value="t")
+            msg = {"messages": [{"role": "user", "content": "hello"}]}
+            with (
+                mock.patch.object(web_server, "get_llm", return_value=_Llm()) as llm_factory,
+                mock.patch.object(web_server, "open_knowledge_store", wraps=web_server.open_knowledge_store) as opener,
+                _running(srv) as base,
+            ):
+                status, body = _post(f"{base}/v1/chat/send", msg, token="t")
+                self.assertEqual(status, 200)
+                self.assertEqual(body["result"]["reply"], "ok")
+                self.assertEqual(body["result"]["knowledge_appended"], 1)
+                status, body = _post(f"{base}/v1/chat/send", {"messages": [{"role": "user", "content": "/show"}]}, token="t")
+                self.assertIn("fact one", body["result"]["reply"])
+                self.assertEqual(opener.call_count, 1)
+                status, body = _post(f"{base}/v1/knowledge/read", {}, token="t")
+                self.assertEqual([r["content"] for r in body["result"]["records"]], ["fact one"])
+                status, body = _post(f"{base}/v1/chat/send", msg, token="t")
+                self.assertEqual(status, 200)
+                self.assertEqual(llm_factory.call_count, 1)
+
+    def test_chat_send_dry_run_leaves_cached_store_untouched(self) -> None:
+        from agents.web import server as web_server
+
+        class _Reply:
+            def __init__(self, fact: str):
+                self.content = f'ok\n<KNOWLEDGE>{{"append":["{fact}"]}}</KNOWLEDGE>'
+
+        class _Llm:
+            def invoke(self, prompt: str) -> _Reply:
+                return _Reply("real fact" if "real" in prompt else "dry fact")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "llm.yaml").write_text("provider: openai\n", encoding="utf-8")
+            srv = web_server.WebUIServer(repo_root=root, port=0, token_value="t")
+            with mock.patch.object(web_server, "get_llm", return_value=_Llm()), _running(srv) as base:
+                real = {"messages": [{"role": "user", "content": "real"}]}
+                self.assertEqual(_post(f"{base}/v1/chat/send", real, token="t")[0], 200)
+                held, _lock = srv._get_ks(srv._knowledge_service.resolve_path(None))
+                dry = {"messages": [{"role": "user", "content": "dry"}], "dry_run": True}
+                status, body = _post(f"{base}/v1/chat/send", dry, token="t")
+                self.assertEqual((status, body["result"]["knowledge_appended"]), (200, 1))
+                self.assertEqual([r.content for r in held.records], ["real fact"])
+                self.assertEqual(_post(f"{base}/v1/chat/send", real, token="t")[0], 200)
+                status, body = _post(f"{base}/v1/knowledge/read", {}, token="t")
+                self.assertEqual([r["content"] for r in body["result"]["records"]], ["real fact", "real fact"])
+
+    def test_inflight_limit_spares_health_and_rejects_extra_posts(self) -> None:
+        from agents.web import server as web_server
+
+        release = threading.Event()
+        entered = threading.Event()
+
+        class _Reply:
+            content = "ok"
+
+        class _Llm:
+            def invoke(self, prompt: str) -> _Reply:
+                entered.set()
+                release.wait(10)
+                return _Reply()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "llm.yaml").write_text("provider: openai\n", encoding="utf-8")
+            srv = web_server.WebUIServer(repo_root=root, port=0, token_value="t", max_inflight_requests=1)
+            msg = {"messages": [{"role": "user", "content": "hello"}], "dry_run": True}
+            with (
+                mock.patch.object(web_server, "get_llm", return_value=_Llm()),
+                mock.patch.object(web_server, "_REQUEST_SLOT_WAIT_S", 0.2),
+                _running(srv) as base,
+            ):
+                slow = threading.Thread(target=_post, args=(f"{base}/v1/chat/send", msg), kwargs={"token": "t"})
+                slow.start()
+                try:
+                    self.assertTrue(entered.wait(5))
+                    with urllib.request.urlopen(f"{base}/health", timeout=2) as r:
+                        self.assertEqual(r.status, 200)
+                    status, body = _post(f"{base}/v1/prompt/read", {}, token="t")
+                    self.assertEqual((status, body["error"]["code"]), (503, "server_busy"))
+                finally:
+                    release.set()
+                    slow.join(5)
+                status, _body = _post(f"{base}/v1/prompt/read", {}, token="t")
+                self.assertEqual(status, 200)
+
+    def test_failed_knowledge_save_drops_cached_store(self) -> None:
+        from agents.web import server as web_server
+
+        class _Reply:
+            def __init__(self, fact: str):
+                self.content = f'ok\n<KNOWLEDGE>{{"append":["{fact}"]}}</KNOWLEDGE>'
+
+        class _Llm:
+            def invoke(self, prompt: str) -> _Reply:
+                return _Reply("lost fact" if "second" in prompt else "kept fact")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "llm.yaml").write_text("provider: openai\n", encoding="utf-8")
+            srv = web_server.WebUIServer(repo_root=root, port=0, token_value="t")
+            with mock.patch.object(web_server, "get_llm", return_value=_Llm()), _running(srv) as base:
+                first = {"messages": [{"role": "user", "content": "first"}]}
+                self.assertEqual(_post(f"{base}/v1/chat/send", first, token="t")[0], 200)
+                held, _lock = srv._get_ks(srv._knowledge_service.resolve_path(None))
+                second = {"messages": [{"role": "user", "content": "second"}]}
+                with mock.patch.object(held, "save", side_effect=OSError("disk full")):
+                    self.assertEqual(_post(f"{base}/v1/chat/send", second, token="t")[0], 500)
+                status, body = _post(f"{base}/v1/chat/send", {"messages": [{"role": "user", "content": "/show"}]}, token="t")
+                self.assertNotIn("lost fact", body["result"]["reply"])
+                self.assertEqual(_post(f"{base}/v1/chat/send", first, token="t")[0], 200)
+                status, body = _post(f"{base}/v1/knowledge/read", {}, token="t")
+                self.assertEqual([r["content"] for r in body["result"]["records"]], ["kept fact", "kept fact"])
+
+    def test_chat_send_rejects_when_llm_slots_are_busy(self) -> None:
+        from agents.web import server as web_server
+
+        release = threading.Event()
+
+        class _Reply:
+            content = "ok"
+
+        class _Llm:
+            def invoke(self, prompt: str) -> _Reply:
+                release.wait(10)
+                return _Reply()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "llm.yaml").write_text("provider: openai\n", encoding="utf-8")
+            srv = web_server.WebUIServer(repo_root=root, port=0, token_value="t", llm_concurrency=1, llm_timeout_s=0.2)
+            msg = {"messages": [{"role": "user", "content": "hello"}], "dry_run": True}
+            with mock.patch.object(web_server, "get_llm", return_value=_Llm()), _running(srv) as base:
+                status, body = _post(f"{base}/v1/chat/send", msg, token="t")
+                self.assertEqual((status, body["error"]["code"]), (504, "llm_timeout"))
+                status, body = _post(f"{base}/v1/chat/send", msg, token="t")
+                self.assertEqual((status, body["error"]["code"]), (503, "llm_busy"))
+                spec = {"messages": [{"role": "user", "content": "/spec"}], "dry_run": True}
+                status, body = _post(f"{base}/v1/chat/send", spec, token="t")
+                self.assertEqual((status, body["error"]["code"]), (503, "llm_busy"))
+                release.set()
+                deadline = time.monotonic() + 5
+                while time.monotonic() < deadline:
+                    status, body = _post(f"{base}/v1/chat/send", msg, token="t")
+                    if status != 503:
+                        break
+                    time.sleep(0.05)
+                self.assertEqual(status, 200)
+
+    def test_oversized_body_rejected_before_auth(self) -> None:
+        from agents.web.server import WebUIServer
+
+        with tempfile.TemporaryDirectory() as tmp:
+            srv = WebUIServer(repo_root=tmp, port=0, token_value="t", max_body_bytes=16)
+            with _running(srv) as base:
+                conn = http.client.HTTPConnection(base.removeprefix("http://"), timeout=5)
+                try:
+                    conn.putrequest("POST", "/v1/chat/send")
+                    conn.putheader("Content-Length", "1048576")
+                    conn.endheaders()
+                    r = conn.getresponse()
+                    self.assertEqual(r.status, 413)
+                    self.assertEqual(json.loads(r.read())["error"]["code"], "body_too_large")
+                finally:
+                    conn.close()
+
+
+    def test_keep_alive_reuses_connection(self) -> None:
+        from agents.web.server import WebUIServer
+
+        with tempfile.TemporaryDirectory() as tmp:
+            srv = WebUIServer(repo_root=tmp, port=0, token_env=None)
+            with _running(srv) as base:
+                conn = http.client.HTTPConnection(base.removeprefix("http://"), timeout=5)
+                try:
+                    conn.request("GET", "/health")
+                    r = conn.getresponse()
+                    self.assertEqual(r.read(), b'{"ok":true}')
+                    sock = conn.sock
+                    self.assertIsNotNone(sock)
+                    conn.request("POST", "/v1/prompt/read", body=b"{}", headers={"Content-Type": "application/json"})
+                    r = conn.getresponse()
+                    self.assertEqual(r.status, 200)
+                    self.assertTrue(json.loads(r.read())["ok"])
+                    self.assertIs(conn.sock, sock)
+                    conn.request("POST", "/v1/prompt/read", body=b'{"ignored": [1, 2', headers={"Content-Type": "application/json"})
+                    r = conn.getresponse()
+                    self.assertEqual(r.status, 200)
+                    r.read()
+                    conn.request("GET", "/health")
+                    self.assertEqual(conn.getresponse().read(), b'{"ok":true}')
+                    self.assertIs(conn.sock, sock)
+                finally:
+                    conn.close()
+
+    def test_invalid_content_length_is_rejected_and_closes(self) -> None:
+        from agents.web.server import WebUIServer
+
+        with tempfile.TemporaryDirectory() as tmp:
+            srv = WebUIServer(repo_root=tmp, port=0, token_env=None)
+            with _running(srv) as base:
+                host, port = base.removeprefix("http://").split(":")
+                smuggled = b"GET /health HTTP/1.1\r\nHost: x\r\n\r\n"
+                for value in [b"+" + str(len(smuggled)).encode(), b"1, 1", b"-1"]:
+                    with socket.create_connection((host, int(port)), timeout=5) as s:
+                        s.sendall(
+                            b"POST /v1/prompt/read HTTP/1.1\r\nHost: x\r\nContent-Length: " + value + b"\r\n\r\n" + smuggled
+                        )
+                        data = b""
+                        while chunk := s.recv(65536):
+                            data += chunk
+                    self.assertTrue(data.startswith(b"HTTP/1.1 400 "), data[:40])
+                    self.assertEqual(data.count(b"HTTP/1.1 "), 1)
+                    self.assertIn(b"invalid_content_length", data)
+
+
+if __name__ == "__main__":
+    unittest.main()